@@ -0,0 +1,81 @@
+from decimal import Decimal
+import json
+import os
+import threading
+import time
+
+
+def chunks(iterable, size):
+    """Yields lists of up to ``size`` items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class RateLimiter(object):
+    """
+    Spaces out work done by many threads, so that at most ``rate`` units
+    go through per second. A rate of None means no limit.
+    """
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next = time.time()
+
+    def acquire(self, units=1):
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next)
+            self._next = start + float(units) / self.rate
+
+        if start > now:
+            time.sleep(start - now)
+
+
+def json_default(value):
+    """Lets json.dumps handle the Decimals boto gives us for numbers"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError('%r is not JSON serializable' % value)
+
+
+class ScanCheckpoint(object):
+    """
+    Progress of a segmented (parallel) scan, kept in a JSON file so it can be resumed.
+    Each segment has its LastEvaluatedKey, a done flag and a count of items seen.
+    Without a path nothing is saved.
+    """
+
+    def __init__(self, path, total_segments):
+        self.path = path
+        self.total_segments = total_segments
+        self.segments = dict((segment, {'last_key': None, 'done': False, 'count': 0})
+                             for segment in range(total_segments))
+        self.resumed = False
+
+        if path and os.path.exists(path):
+            with open(path) as fp:
+                data = json.load(fp)
+            self.total_segments = data['total_segments']
+            self.segments = dict((int(segment), progress) for segment, progress in data['segments'].items())
+            self.resumed = True
+
+    def save(self):
+        if not self.path:
+            return
+
+        # Write a temporary file first, so a crash never leaves half a checkpoint
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump({'total_segments': self.total_segments, 'segments': self.segments},
+                      fp, default=json_default)
+        os.rename(tmp_path, self.path)
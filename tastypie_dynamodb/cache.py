@@ -0,0 +1,75 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class NegativeCache(object):
+    """
+    Remembers keys of items that don't exist, for ``ttl`` seconds.
+    At most ``max_size`` keys are kept, the oldest ones are dropped first.
+    A ttl or max_size of 0/None turns the cache off.
+
+    The cache is per process, so a write made by another process is only
+    seen once the entry expires. Keep the ttl short.
+
+    A read that found nothing may finish after a write created the item.
+    Take a ``generation()`` before reading and pass it to ``add``, which
+    then skips keys written (discarded) since. The last ``max_size`` writes
+    are remembered, for older ones we assume the worst.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+        # key -> generation of its last write, and the newest generation dropped from it
+        self._writes = OrderedDict()
+        self._forgotten = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._entries.get(key, None)
+            if expires is None:
+                return False
+            if expires < time.time():
+                del self._entries[key]
+                return False
+            self.hits += 1
+            return True
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def add(self, key, generation=None):
+        if not self.ttl or not self.max_size:
+            return
+
+        with self._lock:
+            if generation is not None and self._writes.get(key, self._forgotten) > generation:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = time.time() + self.ttl
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        if not self.ttl or not self.max_size:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self._writes.pop(key, None)
+            self._writes[key] = self._generation
+            while len(self._writes) > self.max_size:
+                _, self._forgotten = self._writes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._writes.clear()
+            self._forgotten = self._generation
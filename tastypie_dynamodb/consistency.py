@@ -0,0 +1,95 @@
+"""
+Consistency policies decide, read by read, whether DynamoDB should do a strongly
+consistent read (which costs twice the read capacity) or an eventually consistent one.
+Set one as Meta.consistency_policy of a resource.
+"""
+import hashlib
+import time
+
+from django.core import signing
+
+
+class ConsistencyPolicy(object):
+    """Base policy, always reads eventually consistent"""
+
+    def consistent_read(self, resource, request, key):
+        return False
+
+    def record_write(self, resource, request, key):
+        pass
+
+    def finalize_response(self, resource, request, response):
+        pass
+
+
+class StrongConsistency(ConsistencyPolicy):
+    """Always reads strongly consistent"""
+
+    def consistent_read(self, resource, request, key):
+        return True
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value.decode('utf-8')
+    return unicode(value)
+
+
+class ReadYourWrites(ConsistencyPolicy):
+    """
+    Eventually consistent reads, unless the same client session wrote the key
+    within the last ``window`` seconds.
+
+    The session is a signed token listing digests of the recently written keys,
+    with the time of each write. It is set as a cookie and an X-Dynamo-Session
+    response header whenever a request writes, clients that don't keep cookies
+    can send the header back instead.
+    """
+
+    salt = 'tastypie_dynamodb.consistency'
+
+    def __init__(self, window=10, cookie_name='dynamo_session', max_keys=50):
+        self.window = window
+        self.cookie_name = cookie_name
+        self.max_keys = max_keys
+
+    def _digest(self, resource, key):
+        parts = [resource._meta.resource_name] + [u'%s=%s' % (attr, _text(val)) for attr, val in key]
+        return hashlib.sha1(u'\x00'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+    def _writes(self, request):
+        """Recent writes of the session, {key digest: time of write}"""
+        if hasattr(request, '_dynamo_writes'):
+            return request._dynamo_writes
+
+        token = request.META.get('HTTP_X_DYNAMO_SESSION') or request.COOKIES.get(self.cookie_name)
+        writes = {}
+        if token:
+            try:
+                writes = signing.loads(token, salt=self.salt, max_age=self.window)
+            except signing.BadSignature:
+                pass
+
+        now = time.time()
+        request._dynamo_writes = dict((digest, at) for digest, at in writes.items() if now - at < self.window)
+        return request._dynamo_writes
+
+    def consistent_read(self, resource, request, key):
+        return self._digest(resource, key) in self._writes(request)
+
+    def record_write(self, resource, request, key):
+        writes = self._writes(request)
+        writes[self._digest(resource, key)] = time.time()
+
+        if len(writes) > self.max_keys:
+            recent = sorted(writes.items(), key=lambda write: write[1])[-self.max_keys:]
+            request._dynamo_writes = writes = dict(recent)
+        request._dynamo_session_changed = True
+
+    def finalize_response(self, resource, request, response):
+        if not getattr(request, '_dynamo_session_changed', False):
+            return
+
+        token = signing.dumps(self._writes(request), salt=self.salt, compress=True)
+        response.set_cookie(self.cookie_name, token, max_age=self.window, httponly=True)
+        response['X-Dynamo-Session'] = token
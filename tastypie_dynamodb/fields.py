@@ -2,6 +2,8 @@ from tastypie.fields import ApiField, ToOneField as TastyOneField, NOT_PROVIDED
 from django.core.urlresolvers import NoReverseMatch, get_script_prefix, resolve, Resolver404
 from django.utils import importlib
 
+from tastypie_dynamodb import profiling
+
 class PrimaryKeyField(ApiField):
     def hydrate(self, bundle):
         if bundle.request.method == 'PUT':
@@ -37,28 +39,29 @@ class ToOneDjangoField(TastyOneField):
         )
 
     def dehydrate(self, bundle, for_list=True):
-        value = getattr(bundle.obj, self.dynamo_field)
-        if not value:
-            return None
+        with profiling.span('relations'):
+            value = getattr(bundle.obj, self.dynamo_field)
+            if not value:
+                return None
 
-        if self.separator:
-            value = value.split(self.separator)[self.value_index]
+            if self.separator:
+                value = value.split(self.separator)[self.value_index]
 
-        try:
-            exec("obj = self.model_class.objects.get(%s='%s')" % (self.model_field, value))
-        except self.model_class.DoesNotExist:
-            return None
+            try:
+                exec("obj = self.model_class.objects.get(%s='%s')" % (self.model_field, value))
+            except self.model_class.DoesNotExist:
+                return None
 
-        resource = self.get_related_resource(bundle.obj)
-        bundle2 = resource.build_bundle(obj)
-        kwargs = resource.resource_uri_kwargs(bundle2)
+            resource = self.get_related_resource(bundle.obj)
+            bundle2 = resource.build_bundle(obj)
+            kwargs = resource.resource_uri_kwargs(bundle2)
 
-        url_name = 'api_dispatch_detail'
+            url_name = 'api_dispatch_detail'
 
-        try:
-            return resource._build_reverse_url(url_name, kwargs=kwargs)
-        except NoReverseMatch:
-            return ''
+            try:
+                return resource._build_reverse_url(url_name, kwargs=kwargs)
+            except NoReverseMatch:
+                return ''
 
 
 """
@@ -114,28 +117,29 @@ class ToOneField(TastyOneField):
         return kwargs
 
     def dehydrate(self, bundle, for_list=True):
-        if self.aliases:
-            for dest, src in self.aliases.iteritems():
-                setattr(bundle.obj, dest, getattr(bundle.obj, src))
+        with profiling.span('relations'):
+            if self.aliases:
+                for dest, src in self.aliases.iteritems():
+                    setattr(bundle.obj, dest, getattr(bundle.obj, src))
 
-        resource = self.get_related_resource(bundle.obj)
-        kwargs = resource.resource_uri_kwargs(bundle)
+            resource = self.get_related_resource(bundle.obj)
+            kwargs = resource.resource_uri_kwargs(bundle)
 
-        url_name = 'api_dispatch_detail'
+            url_name = 'api_dispatch_detail'
 
-        if self.separator:
-            val = getattr(bundle.obj, self.attribute).split(self.separator)
-            kwargs['hash_key'] = val[self.hashkey_index]
-            if resource._get_range():
-                kwargs['range_key'] = val[self.rangekey_index]
+            if self.separator:
+                val = getattr(bundle.obj, self.attribute).split(self.separator)
+                kwargs['hash_key'] = val[self.hashkey_index]
+                if resource._get_range():
+                    kwargs['range_key'] = val[self.rangekey_index]
 
-        if not kwargs.get('hash_key', True) or not kwargs.get('range_key', True):
-            return None
+            if not kwargs.get('hash_key', True) or not kwargs.get('range_key', True):
+                return None
 
-        try:
-            return resource._build_reverse_url(url_name, kwargs=kwargs)
-        except NoReverseMatch:
-            return ''
+            try:
+                return resource._build_reverse_url(url_name, kwargs=kwargs)
+            except NoReverseMatch:
+                return ''
 
 
 class HashKeyField(PrimaryKeyField):
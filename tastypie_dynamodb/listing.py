@@ -0,0 +1,93 @@
+import heapq
+
+
+class Descending(object):
+    """Inverts the ordering of a value, so heapq can merge in reverse order"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def merge_sorted(lists, key, limit, reverse=False):
+    """
+    k-way merge of lists that are each already sorted by ``key``,
+    stops once ``limit`` items were taken.
+    Returns the merged items and how many items were taken from every list.
+    """
+    if reverse:
+        sort_key = lambda item: Descending(key(item))
+    else:
+        sort_key = key
+
+    heap = [(sort_key(items[0]), pos) for pos, items in enumerate(lists) if items]
+    heapq.heapify(heap)
+    consumed = [0] * len(lists)
+    merged = []
+    while heap and len(merged) < limit:
+        _, pos = heapq.heappop(heap)
+        items = lists[pos]
+        merged.append(items[consumed[pos]])
+        consumed[pos] += 1
+        if consumed[pos] < len(items):
+            heapq.heappush(heap, (sort_key(items[consumed[pos]]), pos))
+
+    return merged, consumed
+
+
+def matches(item, conditions):
+    """
+    Checks a fetched item against filter conditions in boto's
+    ``<attribute>__<operator>`` format, for reads that can't filter
+    on DynamoDB's side (batch gets).
+    A missing attribute only satisfies ne, null and ncontains.
+    """
+    for cond, arg in conditions.iteritems():
+        attr, _, op = cond.rpartition('__')
+        value = item.get(attr)
+
+        if value is None:
+            if op in ('ne', 'null', 'ncontains'):
+                continue
+            return False
+
+        if op == 'eq':
+            ok = value == arg
+        elif op == 'ne':
+            ok = value != arg
+        elif op == 'lt':
+            ok = value < arg
+        elif op == 'lte':
+            ok = value <= arg
+        elif op == 'gt':
+            ok = value > arg
+        elif op == 'gte':
+            ok = value >= arg
+        elif op == 'nnull':
+            ok = True
+        elif op == 'null':
+            ok = False
+        elif op == 'contains':
+            ok = arg in value
+        elif op == 'ncontains':
+            ok = arg not in value
+        elif op == 'beginswith':
+            ok = isinstance(value, basestring) and value.startswith(arg)
+        elif op == 'in':
+            ok = value in arg
+        elif op == 'between':
+            ok = arg[0] <= value <= arg[1]
+        else:
+            raise ValueError('Unknown filter operator: %s' % op)
+
+        if not ok:
+            return False
+
+    return True
@@ -0,0 +1,75 @@
+"""
+Lightweight per-request timing of phases (parsing, DynamoDB calls, dehydration...).
+
+DynamoHashResource.dispatch starts a profile for the current thread and every
+``span`` entered while handling the request adds its duration to a phase.
+Phases are exclusive, time spent in a nested span only counts for the inner
+phase (dehydrate doesn't include relations), so they add up to at most the total.
+Outside of a profiled request spans cost next to nothing.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import time
+
+_local = threading.local()
+
+
+class RequestProfile(object):
+    """Accumulated durations (in seconds) of the phases of one request"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.phases = OrderedDict()
+        # [phase, started, time spent in nested spans] of the open spans
+        self._stack = []
+
+    def add(self, phase, duration):
+        self.phases[phase] = self.phases.get(phase, 0) + duration
+
+    def total(self):
+        return time.time() - self.started
+
+    def server_timing(self):
+        """Value for the Server-Timing header, durations in milliseconds"""
+        parts = ['%s;dur=%.1f' % (phase, duration * 1000) for phase, duration in self.phases.items()]
+        parts.append('total;dur=%.1f' % (self.total() * 1000))
+        return ', '.join(parts)
+
+
+def start():
+    _local.profile = RequestProfile()
+    return _local.profile
+
+
+def stop():
+    profile = current()
+    _local.profile = None
+    return profile
+
+
+def current():
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def span(phase):
+    """
+    Times the block as ``phase`` of the current profile,
+    leaving out the time spent in spans nested in it.
+    """
+    profile = current()
+    if profile is None:
+        yield
+        return
+
+    frame = [phase, time.time(), 0]
+    profile._stack.append(frame)
+    try:
+        yield
+    finally:
+        profile._stack.pop()
+        elapsed = time.time() - frame[1]
+        profile.add(phase, elapsed - frame[2])
+        if profile._stack:
+            profile._stack[-1][2] += elapsed
@@ -1,20 +1,41 @@
 from operator import itemgetter, attrgetter
+from decimal import Decimal
+from multiprocessing.pool import ThreadPool
+from StringIO import StringIO
+import base64
 import copy
+import csv
 import itertools
+import json
+import logging
+import random
+import threading
+import time
+import urllib
 from django.conf.urls import url
 from django.http import Http404
 
-from tastypie.exceptions import NotFound
+from tastypie.exceptions import NotFound, BadRequest, ImmediateHttpResponse
 from django.core.exceptions import MultipleObjectsReturned
 from tastypie import http
 from tastypie.utils import dict_strip_unicode_keys
 import boto.dynamodb2
-from boto.dynamodb2.exceptions import ItemNotFound
+from boto.dynamodb2.exceptions import ItemNotFound, ConditionalCheckFailedException
+from boto.dynamodb2.items import Item
+from boto.dynamodb2.types import FILTER_OPERATORS, QUERY_OPERATORS
 
 from tastypie.resources import DeclarativeMetaclass, Resource
 from tastypie_dynamodb.objects import DynamoObject
+from tastypie_dynamodb.coalesce import SingleFlight, freeze
+from tastypie_dynamodb.cache import NegativeCache
+from tastypie_dynamodb.consistency import ReadYourWrites
+from tastypie_dynamodb.bulk import RateLimiter, ScanCheckpoint, chunks, json_default
+from tastypie_dynamodb.listing import matches, merge_sorted
 
-from tastypie_dynamodb import fields
+from tastypie_dynamodb import fields, profiling
+
+logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger('tastypie_dynamodb.slow_requests')
 
 
 class DynamoDeclarativeMetaclass(DeclarativeMetaclass):
@@ -33,10 +54,67 @@ class DynamoDeclarativeMetaclass(DeclarativeMetaclass):
         if not hasattr(new_class._meta, 'consistent_read'):
             setattr(new_class._meta, 'consistent_read', False)
 
+        #ensure reads follow a consistency policy, read-your-writes by default
+        if not hasattr(new_class._meta, 'consistency_policy'):
+            setattr(new_class._meta, 'consistency_policy', ReadYourWrites())
+
         #ensure that object_class has a value
         if getattr(new_class._meta, 'object_class', None) == None:
             setattr(new_class._meta, 'object_class', DynamoObject)
 
+        #ensure identical concurrent reads are coalesced by default
+        if not hasattr(new_class._meta, 'coalesce_reads'):
+            setattr(new_class._meta, 'coalesce_reads', True)
+
+        #ensure bulk deletes (obj_delete_list) are bounded, and off over HTTP unless enabled
+        if not hasattr(new_class._meta, 'bulk_delete_enabled'):
+            setattr(new_class._meta, 'bulk_delete_enabled', False)
+        if not hasattr(new_class._meta, 'bulk_delete_workers'):
+            setattr(new_class._meta, 'bulk_delete_workers', 4)
+        if not hasattr(new_class._meta, 'bulk_delete_segments'):
+            setattr(new_class._meta, 'bulk_delete_segments', 4)
+        if not hasattr(new_class._meta, 'bulk_delete_rate'):
+            setattr(new_class._meta, 'bulk_delete_rate', None)
+        if not hasattr(new_class._meta, 'bulk_delete_max_retries'):
+            setattr(new_class._meta, 'bulk_delete_max_retries', 8)
+        if not hasattr(new_class._meta, 'bulk_delete_allow_all'):
+            setattr(new_class._meta, 'bulk_delete_allow_all', False)
+
+        #ensure the negative cache has a value, it is off unless given a ttl (seconds)
+        if not hasattr(new_class._meta, 'negative_cache_ttl'):
+            setattr(new_class._meta, 'negative_cache_ttl', None)
+        if not hasattr(new_class._meta, 'negative_cache_size'):
+            setattr(new_class._meta, 'negative_cache_size', 10000)
+
+        #ensure request profiling has a value, it is off unless asked for, see dispatch
+        if not hasattr(new_class._meta, 'server_timing'):
+            setattr(new_class._meta, 'server_timing', False)
+        #a function set in Meta comes back as an unbound method, we want the function
+        timing_hook = getattr(new_class._meta, 'timing_hook', None)
+        setattr(new_class._meta, 'timing_hook', getattr(timing_hook, '__func__', timing_hook))
+        if not hasattr(new_class._meta, 'slow_request_threshold'):
+            setattr(new_class._meta, 'slow_request_threshold', None)
+        if not hasattr(new_class._meta, 'slow_request_sample_rate'):
+            setattr(new_class._meta, 'slow_request_sample_rate', 1.0)
+
+        #ensure aggregates have a value, they are off without a companion table
+        if not hasattr(new_class._meta, 'aggregate_table'):
+            setattr(new_class._meta, 'aggregate_table', None)
+        if not hasattr(new_class._meta, 'aggregate_sums'):
+            setattr(new_class._meta, 'aggregate_sums', ())
+
+        #ensure exports run a parallel scan
+        if not hasattr(new_class._meta, 'export_segments'):
+            setattr(new_class._meta, 'export_segments', 4)
+        if not hasattr(new_class._meta, 'export_page_size'):
+            setattr(new_class._meta, 'export_page_size', None)
+
+        #ensure fan-out queries (hash_key__in) have sane bounds
+        if not hasattr(new_class._meta, 'fan_out_workers'):
+            setattr(new_class._meta, 'fan_out_workers', 8)
+        if not hasattr(new_class._meta, 'fan_out_max_keys'):
+            setattr(new_class._meta, 'fan_out_max_keys', 100)
+
         #if the user is asking us to auto-build their primary keys
         if getattr(new_class._meta, 'build_primary_keys', False) == True:
             schema = new_class._meta.table.schema
@@ -45,6 +123,19 @@ class DynamoDeclarativeMetaclass(DeclarativeMetaclass):
         return new_class
 
 
+# GET parameters of get_list which are never attribute filters
+RESERVED_LIST_PARAMS = ('limit', 'offset', 'offset_hash', 'offset_range', 'offset_special',
+                        'offset_keys', 'format', 'reverse', 'consistent', 'callback', 'username', 'api_key')
+
+# Operators accepted in GET parameters, (n)null don't take a value so we leave them out
+LIST_FILTER_OPERATORS = set(FILTER_OPERATORS) - set(['null', 'nnull'])
+
+
+def _number(value):
+    """Numeric value of an attribute for sums, missing ones count as 0"""
+    return Decimal(0) if value is None else Decimal(str(value))
+
+
 class DynamoHashResource(Resource):
     """Resource to use for Dynamo tables that only have a hash primary key."""
 
@@ -81,6 +172,16 @@ class DynamoHashResource(Resource):
 
             self._meta.indexes[index.name] = (indexed_field, mapped_field)
 
+        # Shared by all threads using this resource, see _coalesce
+        self._single_flight = SingleFlight()
+
+        # Primary keys known not to exist, so obj_get can 404 without a read
+        self._negative_cache = NegativeCache(self._meta.negative_cache_ttl, self._meta.negative_cache_size)
+
+        # Started on the first hash_key__in list, see _get_fan_out_pool
+        self._fan_out_pool = None
+        self._fan_out_lock = threading.Lock()
+
     def _get_hash(self):
         tmp = filter(lambda field: field.attr_type == 'HASH', self.table_schema)
         if tmp:
@@ -91,6 +192,58 @@ class DynamoHashResource(Resource):
         tmp = filter(lambda field: field.attr_type == 'RANGE', self.table_schema)
         return tmp[0] if tmp else None
 
+    def dispatch(self, request_type, request, **kwargs):
+        """
+        Profiles the phases of the request (see tastypie_dynamodb.profiling).
+        Timings go out in a Server-Timing header (Meta.server_timing), to
+        Meta.timing_hook(resource, request, profile) and, when the request took
+        longer than Meta.slow_request_threshold seconds, to the slow request log
+        (sampled with Meta.slow_request_sample_rate).
+        Failed requests (Http404, BadRequest...) are recorded too, the header only
+        makes it to responses we have, including those of ImmediateHttpResponse.
+        It also lets the consistency policy attach the session of the client to the response.
+        """
+        profiled = self._meta.server_timing or self._meta.timing_hook \
+            or self._meta.slow_request_threshold is not None
+        if not profiled or profiling.current() is not None:
+            response = super(DynamoHashResource, self).dispatch(request_type, request, **kwargs)
+        else:
+            profiling.start()
+            response = None
+            try:
+                response = super(DynamoHashResource, self).dispatch(request_type, request, **kwargs)
+            except ImmediateHttpResponse as e:
+                response = e.response
+                raise
+            finally:
+                profile = profiling.stop()
+                if self._meta.server_timing and response is not None:
+                    response['Server-Timing'] = profile.server_timing()
+                self.record_timings(request, profile)
+
+        if self._meta.consistency_policy is not None:
+            self._meta.consistency_policy.finalize_response(self, request, response)
+        return response
+
+    def record_timings(self, request, profile):
+        """Passes the profile of a finished request to the metrics hook and slow request log"""
+        if self._meta.timing_hook:
+            self._meta.timing_hook(self, request, profile)
+
+        threshold = self._meta.slow_request_threshold
+        if threshold is not None and profile.total() >= threshold \
+                and random.random() < self._meta.slow_request_sample_rate:
+            slow_request_logger.warning('Slow request %s %s: %s', request.method,
+                                        request.get_full_path(), profile.server_timing())
+
+    def full_dehydrate(self, bundle, for_list=False):
+        with profiling.span('dehydrate'):
+            return super(DynamoHashResource, self).full_dehydrate(bundle, for_list=for_list)
+
+    def serialize(self, request, data, format, options=None):
+        with profiling.span('serialize'):
+            return super(DynamoHashResource, self).serialize(request, data, format, options=options)
+
     def dispatch_detail(self, request, **k):
         """Ensure that the hash_key is received in the correct type"""
         k['hash_key'] = self._hash_key_type(k['hash_key'])
@@ -113,10 +266,66 @@ class DynamoHashResource(Resource):
         return kwargs
 
     def prepend_urls(self):
-        return [
+        return self._aggregate_urls() + [
             url(r'^(?P<resource_name>%s)/(?P<hash_key>.+)/$' % self._meta.resource_name, self.wrap_view('dispatch_detail'), name='api_dispatch_detail'),
         ]
 
+    def _aggregate_urls(self):
+        # Has to come before detail urls, which would match it too,
+        # so we only take the url over when there are aggregates
+        if self._meta.aggregate_table is None:
+            return []
+        return [
+            url(r'^(?P<resource_name>%s)/(?P<hash_key>[^/]+)/aggregate/$' % self._meta.resource_name, self.wrap_view('dispatch_aggregate'), name='api_dispatch_aggregate'),
+        ]
+
+    def _coalesce(self, key, fn, consistent=False):
+        """
+        Runs ``fn`` unless an identical read (same ``key``) is already in flight,
+        in which case we wait for it and share its result.
+        Strongly ``consistent`` reads always run, the read in flight may have
+        started before a write they have to see.
+        Waiting is profiled as the dynamo phase, like the read itself.
+        """
+        with profiling.span('dynamo'):
+            if consistent or not self._meta.coalesce_reads:
+                return fn()
+            return self._single_flight.do(freeze(key), fn)
+
+    def get_coalescing_stats(self):
+        """Counters of DynamoDB reads made and saved by request coalescing"""
+        return self._single_flight.stats()
+
+    def _item_key(self, item):
+        """Hashable primary key of an item, the same as freeze(get_dynamo_filter(...))"""
+        key_attrs = [field.name for field in (self._get_hash(), self._get_range()) if field]
+        return freeze(dict((attr, item.get(attr)) for attr in key_attrs))
+
+    def is_consistent_read(self, request, key=None, consistent=None):
+        """
+        Whether a read should be strongly consistent.
+        ``consistent`` forces it either way, Meta.consistent_read keeps every read strong,
+        clients can ask for it with ?consistent=true or an X-Consistent-Read: true header.
+        Otherwise Meta.consistency_policy decides for reads of a single ``key``.
+        """
+        if consistent is not None:
+            return consistent
+        if self._meta.consistent_read:
+            return True
+        if request is None:
+            return False
+
+        explicit = request.GET.get('consistent', None) or request.META.get('HTTP_X_CONSISTENT_READ', None)
+        if explicit is not None:
+            return explicit.lower() in ('true', '1')
+
+        policy = self._meta.consistency_policy
+        return key is not None and policy is not None and policy.consistent_read(self, request, key)
+
+    def _record_write(self, request, key):
+        if request is not None and self._meta.consistency_policy is not None:
+            self._meta.consistency_policy.record_write(self, request, key)
+
     def get_dynamo_filter(self, kwargs):
         filt = dict()
         filt[self._get_hash().name] = kwargs['hash_key']
@@ -143,13 +352,18 @@ class DynamoHashResource(Resource):
 
         bundle = self.full_hydrate(bundle)
 
+        # aggregates need to know what the write replaced
+        aggregates = self._meta.aggregate_table is not None
+        old_item = None
+
         if primary_keys:
             filt = self.get_dynamo_filter(primary_keys)
             # Extract primary keys
             if force_put:
                 item = filt
             else:
-                item = self._meta.table.get_item(**filt)
+                with profiling.span('dynamo'):
+                    item = self._meta.table.get_item(**filt)
                 if not item.values():
                     raise Http404()
         else:
@@ -167,12 +381,24 @@ class DynamoHashResource(Resource):
             item[key] = val
 
         # if there are keys, this is an update, else it's new
-        if not primary_keys or force_put:
-            # New or PUTting item
-            self._meta.table.put_item(item, overwrite=force_put)
-        else:
-            # Save and overwrite if item exists already
-            item.save(overwrite=True)
+        with profiling.span('dynamo'):
+            if aggregates and primary_keys:
+                # Overwrite and get back whatever was there, in a single call
+                old_item = self._put_item_returning_old(dict(item.items()))
+            elif not primary_keys or force_put:
+                # New or PUTting item, a new one can't replace anything
+                self._meta.table.put_item(item, overwrite=force_put)
+            else:
+                # Save and overwrite if item exists already
+                item.save(overwrite=True)
+
+        # The item exists now
+        key = self._item_key(item)
+        self._negative_cache.discard(key)
+        self._record_write(bundle.request, key)
+
+        if aggregates:
+            self._aggregate_write(old_item, dict(item.items()))
 
         # wrap the item and store it for return
         bundle.obj = DynamoObject(item)
@@ -187,24 +413,226 @@ class DynamoHashResource(Resource):
         """Creates an object in Dynamo"""
         return self._dynamo_update_or_insert(bundle)
 
-    def obj_get(self, bundle, request=None, **k):
-        """Gets an object in Dynamo"""
+    def obj_get(self, bundle, request=None, consistent=None, **k):
+        """
+        Gets an object in Dynamo.
+        Pass ``consistent`` to force (or avoid) a strongly consistent read, see is_consistent_read.
+        """
         filt = self.get_dynamo_filter(k)
-        try:
-            item = self._meta.table.get_item(consistent=self._meta.consistent_read, **filt)
-        except (ItemNotFound):
+        key = freeze(filt)
+        request = bundle.request if bundle is not None else request
+        consistent = self.is_consistent_read(request, key, consistent)
+
+        # We've recently seen this item doesn't exist,
+        # strong reads skip this as they must see writes of other processes
+        if not consistent and key in self._negative_cache:
             raise Http404("Item not found!")
 
-        if not item.values():
-            raise Http404()
-        return DynamoObject(item)
+        def fetch_item():
+            # Taken before reading, a write from now on keeps a miss out of the negative cache
+            generation = self._negative_cache.generation()
+            try:
+                with profiling.span('dynamo'):
+                    item = self._meta.table.get_item(consistent=consistent, **filt)
+            except (ItemNotFound):
+                return generation, None
+            return generation, dict(item.items()) if item.values() else None
+
+        # Identical concurrent eventually consistent reads share a single get_item call
+        generation, data = self._coalesce(('get', filt, consistent), fetch_item, consistent)
+        if data is None:
+            self._negative_cache.add(key, generation)
+            raise Http404("Item not found!")
+        return DynamoObject(dict(data))
 
-    def obj_delete(self, bundle, **k):
+    def obj_delete(self, bundle, request=None, **k):
         """Deletes an object in Dynamo"""
+        table = self._meta.table
         filt = self.get_dynamo_filter(k)
-        item = self._meta.table.get_item(consistent=self._meta.consistent_read, **filt)
-        if item.values():
-            item.delete()
+        key = freeze(filt)
+        request = bundle.request if bundle is not None else request
+        generation = self._negative_cache.generation()
+        with profiling.span('dynamo'):
+            # The deleted item comes back with the delete, None if there was nothing
+            resp = table.connection.delete_item(table.table_name, table._encode_keys(filt),
+                                                return_values='ALL_OLD')
+        self._negative_cache.add(key, generation)
+        self._record_write(request, key)
+
+        old_item = self._decode_item(resp.get('Attributes'))
+        if old_item is not None and self._meta.aggregate_table is not None:
+            self._aggregate_write(old_item, None)
+
+    def _put_item_returning_old(self, data):
+        """Puts an item, overwriting it, and returns the attributes it replaced (None if it was new)"""
+        table = self._meta.table
+        resp = table.connection.put_item(table.table_name, Item(table, data=data).prepare_full(),
+                                         return_values='ALL_OLD')
+        return self._decode_item(resp.get('Attributes'))
+
+    def _decode_item(self, raw):
+        if not raw:
+            return None
+        return dict((name, self._meta.table._dynamizer.decode(value)) for name, value in raw.items())
+
+    def _aggregate_write(self, old_item, new_item):
+        """
+        update_aggregates for a write that already went through.
+        A failure can't undo the write, so it is only logged, rebuild_aggregates repairs the companion item.
+        """
+        try:
+            self.update_aggregates(old_item, new_item)
+        except Exception:
+            logger.exception('Failed to update aggregates of %s',
+                             (new_item or old_item).get(self._get_hash().name))
+
+    def update_aggregates(self, old_item, new_item):
+        """
+        Maintains the companion item of the hash key in Meta.aggregate_table:
+        ``count`` of items, ``min_<range key>``/``max_<range key>`` and
+        ``sum_<attribute>`` for every attribute in Meta.aggregate_sums.
+
+        ``old_item`` is None for new items, ``new_item`` is None for deleted ones.
+        Both have to come from the write itself (ALL_OLD return values), an item
+        read before the write could be outdated by a concurrent one.
+        Counters and sums are changed with atomic ADD updates.
+        """
+        table = self._meta.aggregate_table
+        hkey = self._get_hash().name
+        rkey = self._get_range().name if self._get_range() else None
+        hash_key = (new_item or old_item)[hkey]
+        raw_key = table._encode_keys({hkey: hash_key})
+
+        deltas = {'count': (1 if new_item else 0) - (1 if old_item else 0)}
+        for attr in self._meta.aggregate_sums:
+            deltas['sum_' + attr] = _number((new_item or {}).get(attr)) - _number((old_item or {}).get(attr))
+        deltas = dict((name, delta) for name, delta in deltas.items() if delta)
+
+        with profiling.span('aggregates'):
+            if deltas:
+                names = dict(('#a%d' % i, name) for i, name in enumerate(sorted(deltas)))
+                table.connection.update_item(
+                    table.table_name, raw_key,
+                    update_expression='ADD ' + ', '.join('%s :%s' % (alias, alias[1:]) for alias in sorted(names)),
+                    expression_attribute_names=names,
+                    expression_attribute_values=dict((':' + alias[1:], table._dynamizer.encode(deltas[name]))
+                                                     for alias, name in names.items()))
+
+            if not rkey:
+                return
+
+            if new_item and not old_item:
+                # Only move min/max if the new range key is beyond them
+                for name, op in (('min_' + rkey, '>'), ('max_' + rkey, '<')):
+                    try:
+                        table.connection.update_item(
+                            table.table_name, raw_key,
+                            update_expression='SET #r = :r',
+                            condition_expression='attribute_not_exists(#r) OR #r %s :r' % op,
+                            expression_attribute_names={'#r': name},
+                            expression_attribute_values={':r': table._dynamizer.encode(new_item[rkey])})
+                    except ConditionalCheckFailedException:
+                        pass
+            elif old_item and not new_item:
+                # The deleted item might have been the min or max, look them up again
+                self._refresh_range_aggregates(hash_key)
+
+    def _refresh_range_aggregates(self, hash_key):
+        table = self._meta.aggregate_table
+        hkey = self._get_hash().name
+        rkey = self._get_range().name
+        raw_key = table._encode_keys({hkey: hash_key})
+
+        sets, removes, values = [], [], {}
+        for name, reverse in (('min_' + rkey, False), ('max_' + rkey, True)):
+            edge = [it for it in self._meta.table.query_2(limit=1, reverse=reverse, consistent=True,
+                                                          attributes=[hkey, rkey], **{hkey + '__eq': hash_key})]
+            alias = name[:3]
+            if edge:
+                sets.append('#%s = :%s' % (alias, alias))
+                values[':' + alias] = table._dynamizer.encode(edge[0][rkey])
+            else:
+                removes.append('#' + alias)
+
+        expression = ''
+        if sets:
+            expression += 'SET ' + ', '.join(sets)
+        if removes:
+            expression += ' REMOVE ' + ', '.join(removes)
+
+        table.connection.update_item(
+            table.table_name, raw_key,
+            update_expression=expression.strip(),
+            expression_attribute_names={'#min': 'min_' + rkey, '#max': 'max_' + rkey},
+            expression_attribute_values=values or None)
+
+    def rebuild_aggregates(self, hash_key):
+        """
+        Recomputes the companion item of ``hash_key`` from scratch with a query of the
+        whole partition (a get of the item on tables without a range key).
+        Useful to backfill aggregates, and after obj_delete_list.
+        """
+        hkey = self._get_hash().name
+        rkey = self._get_range().name if self._get_range() else None
+        attrs = [attr for attr in (hkey, rkey) if attr] + list(self._meta.aggregate_sums)
+
+        data = {hkey: hash_key, 'count': 0}
+        for attr in self._meta.aggregate_sums:
+            data['sum_' + attr] = Decimal(0)
+
+        if rkey:
+            items = self._meta.table.query_2(consistent=True, attributes=attrs, **{hkey + '__eq': hash_key})
+        else:
+            # query_2 refuses a lone hash key condition, and there is a single item anyway
+            try:
+                items = [self._meta.table.get_item(consistent=True, attributes=attrs, **{hkey: hash_key})]
+            except (ItemNotFound):
+                items = []
+            items = [it for it in items if it.values()]
+
+        for it in items:
+            data['count'] += 1
+            for attr in self._meta.aggregate_sums:
+                data['sum_' + attr] += _number(it.get(attr))
+            if rkey:
+                if data.get('min_' + rkey) is None or it[rkey] < data['min_' + rkey]:
+                    data['min_' + rkey] = it[rkey]
+                if data.get('max_' + rkey) is None or it[rkey] > data['max_' + rkey]:
+                    data['max_' + rkey] = it[rkey]
+
+        self._meta.aggregate_table.put_item(data, overwrite=True)
+        return data
+
+    def get_aggregates(self, hash_key, consistent=False):
+        """Aggregates of a hash key, an O(1) read of its companion item. Numbers are ints or floats."""
+        hkey = self._get_hash().name
+        try:
+            item = self._meta.aggregate_table.get_item(consistent=consistent, **{hkey: hash_key})
+        except (ItemNotFound):
+            item = None
+
+        data = {hkey: hash_key, 'count': 0}
+        if item is not None and item.values():
+            data.update(dict(item.items()))
+
+        # Serializers turn boto's Decimals into strings
+        return dict((name, json_default(value) if isinstance(value, Decimal) else value)
+                    for name, value in data.items())
+
+    def dispatch_aggregate(self, request, **kwargs):
+        """Responds with the aggregates of the hash key in the URL"""
+        self.method_check(request, allowed=['get'])
+        self.is_authenticated(request)
+        self.throttle_check(request)
+
+        if self._meta.aggregate_table is None:
+            raise Http404("No aggregates for this resource")
+
+        hash_key = self._hash_key_type(kwargs['hash_key'])
+        data = self.get_aggregates(hash_key, consistent=self.is_consistent_read(request))
+
+        self.log_throttled_access(request)
+        return self.create_response(request, data)
 
     def patch_detail(self, request, **kwargs):
         deserialized = self.deserialize(request, request.body, format=request.META.get('CONTENT_TYPE', 'application/json'))
@@ -274,7 +702,112 @@ class DynamoHashResource(Resource):
 
         return items
 
-    def get_list(self, request, **kwargs):
+    def build_filter_conditions(self, get_params, key_params=()):
+        """
+        Builds DynamoDB filter conditions out of GET parameters in format
+        ``<field>__<operator>=<value>`` (or just ``<field>=<value>`` for __eq).
+        ``__in`` and ``__between`` values are comma separated, a ``<field>__from``
+        and ``<field>__to`` pair is a __between and ``*`` at the end of an
+        indexed field's value is a __beginswith, like in key conditions.
+
+        ``key_params`` are the parameters build_list_plan already turned
+        into key conditions, those and relations are skipped here.
+        """
+        hkey = self._get_hash().name
+        indexed = set(itertools.chain(*self._meta.indexes.values()))
+
+        conditions = {}
+        for param, value in get_params.iteritems():
+            if param in RESERVED_LIST_PARAMS or param in key_params:
+                continue
+
+            name, _, op = param.rpartition('__')
+            if op == 'from':
+                if (name + '__to') in get_params:
+                    op, value = 'between', u'%s,%s' % (value, get_params[name + '__to'])
+                else:
+                    op = 'gte'
+            elif op == 'to':
+                if (name + '__from') in get_params:
+                    continue
+                op = 'lte'
+            elif op not in LIST_FILTER_OPERATORS:
+                name, op = param, 'eq'
+                if name in indexed and isinstance(value, basestring) and value.endswith('*'):
+                    op, value = 'beginswith', value[:-1]
+
+            field = self.fields.get(name, None)
+            if field is None or getattr(field, 'is_related', False) or not field.attribute:
+                continue
+            if field.attribute == hkey:
+                continue
+
+            if isinstance(field, fields.DynamoListField):
+                # Lists can only be searched for an element, which we take as it is
+                if op not in ('contains', 'ncontains'):
+                    raise BadRequest('%s only supports __contains and __ncontains' % name)
+                conditions['%s__%s' % (field.attribute, op)] = int(value) if isinstance(value, bool) else value
+                continue
+
+            if op in ('in', 'between'):
+                value = [self._convert_filter_value(field, val) for val in unicode(value).split(',')]
+                if op == 'between' and len(value) != 2:
+                    raise BadRequest('%s expects two comma separated values' % param)
+            else:
+                value = self._convert_filter_value(field, value)
+
+            conditions['%s__%s' % (field.attribute, op)] = value
+
+        return conditions
+
+    def _convert_filter_value(self, field, value):
+        # Booleans are actually integers in dynamo
+        if isinstance(value, bool):
+            return int(value)
+        try:
+            return field.convert(value)
+        except (ValueError, TypeError):
+            raise BadRequest('Invalid value for %s: %s' % (field.instance_name, value))
+
+    def _split_key_conditions(self, dynamo_filter, filter_conditions):
+        """
+        A query takes the hash key and a single condition on the sort key
+        (range key of the table or of the selected index) as key conditions.
+        Everything else is moved to ``filter_conditions``, and a filter on
+        the sort key is promoted to a key condition if there is none.
+        """
+        hkey = self._get_hash().name
+        if 'index' in dynamo_filter:
+            sort_key = self._meta.indexes[dynamo_filter['index']][0]
+        else:
+            sort_key = self._get_range().name if self._get_range() else None
+
+        sort_key_used = False
+        # __between goes last, we rather keep __eq/__beginswith as key conditions
+        conditions = sorted(filter(lambda k: '__' in k, dynamo_filter.keys()), key=lambda k: k.endswith('__between'))
+        for cond in conditions:
+            attr, _, op = cond.rpartition('__')
+            if attr == hkey and op == 'eq':
+                continue
+            if attr == sort_key and op in QUERY_OPERATORS and not sort_key_used:
+                sort_key_used = True
+                continue
+            value = dynamo_filter.pop(cond)
+            filter_conditions.setdefault(cond, value)
+
+        if sort_key and not sort_key_used:
+            for cond in filter_conditions.keys():
+                attr, _, op = cond.rpartition('__')
+                if attr == sort_key and op in QUERY_OPERATORS:
+                    dynamo_filter[cond] = filter_conditions.pop(cond)
+                    break
+
+    def build_list_plan(self, request, kwargs):
+        """
+        Resolves GET parameters and URL kwargs of a list request into
+        the DynamoDB conditions we are going to use.
+        Shared by get_list and obj_delete_list.
+        """
 
         # Copy request.GET parameters and make all keys lowercase
         get_params = request.GET.dict().copy()
@@ -299,10 +832,9 @@ class DynamoHashResource(Resource):
 
         hkey = self._get_hash().name
         rkey = self._get_range().name if self._get_range() else None
-        if rkey and self._get_range().data_type == 'N':
-            rkey_type = int
-        else:
-            rkey_type = str
+
+        # GET parameters which end up as key conditions, see build_filter_conditions
+        key_params = set()
 
         # Trying to filter by HASH key
         if hkey in get_params or 'hash_key' in kwargs:
@@ -311,6 +843,23 @@ class DynamoHashResource(Resource):
             hash_key_filter = value
             dynamo_filter[hkey + '__eq'] = value
 
+        # Trying to filter by several HASH keys at once, we will
+        # fan out one query per key and merge the results
+        hash_key_in = None
+        if (hkey + '__in') in get_params:
+            hash_key_in = []
+            for value in unicode(get_params[hkey + '__in']).split(','):
+                try:
+                    value = self._hash_key_type(value)
+                except ValueError:
+                    raise BadRequest('Invalid value for %s__in: %s' % (hkey, value))
+                if value not in hash_key_in:
+                    hash_key_in.append(value)
+
+            if len(hash_key_in) > self._meta.fan_out_max_keys:
+                raise BadRequest('%s__in accepts at most %d keys' % (hkey, self._meta.fan_out_max_keys))
+            hash_key_filter = hash_key_in
+
         # Maybe we are trying to filter using other Tastypie resources
         # For now we only support filter by tastypie-dynamo ToOneField
         for param, val in get_params.iteritems():
@@ -369,6 +918,7 @@ class DynamoHashResource(Resource):
             # Filtering by range key
             rkey = self._get_range().name
             if rkey in get_params or 'range_key' in kwargs:
+                key_params.add(rkey)
                 value = get_params.get(rkey, kwargs['range_key'])
                 if value != '*':
                     if value[-1] == '*':
@@ -387,7 +937,7 @@ class DynamoHashResource(Resource):
         if esk:
             dynamo_filter['exclusive_start_key'] = esk
 
-        index_range_field = None
+        index_range_field = index_field = None
         # Are we trying to filter?
         if hash_key_filter:
 
@@ -400,6 +950,7 @@ class DynamoHashResource(Resource):
                         param_from = int(get_params[param + '__from'])
                         param_to = int(get_params[param + '__to'])
                         dynamo_filter[param + '__between'] = [param_from, param_to]
+                        key_params.update([from_param, param + '__to'])
 
                         if param != self._get_range().name:
                             # This is not a range key filtering, try to find an index
@@ -410,7 +961,7 @@ class DynamoHashResource(Resource):
                                     dynamo_filter['index'] = index
                                     break
                     except:
-                        print 'Failed to create __between filter'
+                        logger.debug('Failed to create __between filter')
 
             # Check if trying to filter by indexed key
             all_fields = set(itertools.chain(*self._meta.indexes.values()))
@@ -437,90 +988,151 @@ class DynamoHashResource(Resource):
                             else:
                                 dynamo_filter[_fields[0] + '__eq'] = val
                             index_range_field = _fields[0]
+                            key_params.add(index_field)
                             break
 
-        # If there are more than 2 conditions, we need to scan, not query
+        # Conditions on any other attribute are filtered on DynamoDB's side
+        filter_conditions = self.build_filter_conditions(get_params, key_params)
+        self._split_key_conditions(dynamo_filter, filter_conditions)
+
+        return {
+            'get_params': get_params,
+            'order_asc': order_asc,
+            'limit': limit,
+            'dynamo_filter': dynamo_filter,
+            'filter_conditions': filter_conditions,
+            'hash_key_filter': hash_key_filter,
+            'hash_key_in': hash_key_in,
+            'hkey_in_next': hkey_in_next,
+            'offset_special': offset_special,
+            'offset_range': offset_range,
+            'index_range_field': index_range_field,
+            'index_field': index_field,
+        }
+
+    def get_list(self, request, **kwargs):
+        with profiling.span('parse'):
+            plan = self.build_list_plan(request, kwargs)
+        get_params = plan['get_params']
+        order_asc = plan['order_asc']
+        limit = plan['limit']
+        dynamo_filter = plan['dynamo_filter']
+        filter_conditions = plan['filter_conditions']
+        hash_key_filter = plan['hash_key_filter']
+        hash_key_in = plan['hash_key_in']
+        hkey_in_next = plan['hkey_in_next']
+        offset_special = plan['offset_special']
+        offset_range = plan['offset_range']
+        index_range_field = plan['index_range_field']
+        index_field = plan['index_field']
+
+        hkey = self._get_hash().name
+        rkey = self._get_range().name if self._get_range() else None
+        if rkey and self._get_range().data_type == 'N':
+            rkey_type = int
+        else:
+            rkey_type = str
+
+        if hash_key_in:
+            # Pagination is carried by the composite offset_keys cursor
+            dynamo_filter.pop('exclusive_start_key', None)
+            return self.get_fan_out_list(request, hash_key_in, dynamo_filter, filter_conditions,
+                                         order_asc, limit, get_params)
+
+        # Without a hash key there is no key condition, we have to scan
+        scanning = not hash_key_filter
+        if scanning:
+            dynamo_filter.pop('index', None)
+            dynamo_filter.update(filter_conditions)
+            filter_conditions = {}
+
         cutoff_ts = False
-        force_scan = False
         query_filter = None
         real_limit = limit
-        if (len(dynamo_filter) - 1 if 'index' in dynamo_filter else 0) > 2:
-            # Check if we can
-            if ('%s__between' % rkey) in dynamo_filter and 'index' in dynamo_filter:
-                # Timestamp is being filtered, and we have a filter
-                query_filter = dynamo_filter['%s__between' % rkey]
-                del dynamo_filter['%s__between' % rkey]
-                real_limit = limit
-                limit = None  # Get all results, not just 20
-                print 'New dynamo_filter', dynamo_filter
-                print 'query_filter', query_filter
-            else:
-                force_scan = True
-                if 'index' in dynamo_filter:
-                    del dynamo_filter['index']
-
-        if force_scan or not hash_key_filter:
-            print 'scanning with filter', dynamo_filter, 'and limit', limit
-            _items = self._meta.table.scan(limit=limit,
-                                           **dynamo_filter)
-        else:
-            if rkey and 'index' in dynamo_filter and 'ts__between' not in dynamo_filter and not query_filter and rkey == 'ts':
+        if not scanning and rkey and 'index' in dynamo_filter:
+            if (rkey + '__between') in filter_conditions:
+                # Timestamp is being filtered, and we have an index
+                query_filter = filter_conditions[rkey + '__between']
+            elif rkey == 'ts':
                 # We are querying by some index which is not range key
-                # So we need to get _all_ data resulting for this query, sort it
-                # and then cut it...
-                limit = None
-                query_filter = (0, 1999999999999)
-                offset_range = 0 if order_asc else 1999999999999
+                query_filter = [0, 1999999999999]
                 cutoff_ts = True
 
-            print 'querying with filter', dynamo_filter, 'and limit', limit
-            # There is a bug in boto, where it sets scan_index_forward=reverse
-            # but it should be other way around
-            _items = self._meta.table.query(limit=limit,
-                                            reverse=order_asc,
-                                            **dynamo_filter)
+            if query_filter:
+                # Items come in index order, so we need to get _all_ data resulting
+                # for this query, sort it by range key and then cut it...
+                # Both the window and the offset of the previous page are
+                # filtered by DynamoDB, we only sort here
+                limit = None
+                range_from, range_to = query_filter
+                if offset_special:
+                    if order_asc:
+                        range_from = max(range_from, offset_range + 1)
+                    else:
+                        range_to = min(range_to, offset_range - 1)
+                filter_conditions[rkey + '__between'] = [range_from, range_to]
+
+        # Lists are only read strongly consistent when asked to
+        consistent = self.is_consistent_read(request)
 
         keys_only_index = False
-        if not force_scan and 'index' in dynamo_filter:
+        if not scanning and 'index' in dynamo_filter:
             # Is this an indexed scan of keys_only index?
             index_obj = filter(lambda ind: ind.name == dynamo_filter['index'], self._meta.table.indexes)[0]
             keys_only_index = index_obj.projection_type == 'KEYS_ONLY'
 
-        if keys_only_index:
-            # We need to batch-get actual items...
-            req = [{hkey: it[hkey], rkey: rkey_type(it[rkey])} for it in _items]
-            if req:
-                _items = self._meta.table.batch_get(keys=req)
+        def fetch_items():
+            with profiling.span('dynamo'):
+                if scanning:
+                    logger.debug('scanning with filter %s and limit %s', dynamo_filter, limit)
+                    result_set = self._meta.table.scan(limit=limit,
+                                                       **dynamo_filter)
+                else:
+                    logger.debug('querying with filter %s %s and limit %s', dynamo_filter, filter_conditions, limit)
+                    result_set = self._meta.table.query_2(limit=limit,
+                                                          reverse=not order_asc,
+                                                          consistent=consistent,
+                                                          query_filter=filter_conditions or None,
+                                                          **dynamo_filter)
+                fetched = [it for it in result_set]
+
+            if keys_only_index and fetched:
+                # We need to batch-get actual items...
+                req = [{hkey: it[hkey], rkey: rkey_type(it[rkey])} for it in fetched]
+                with profiling.span('batch_get'):
+                    fetched = [it for it in self._meta.table.batch_get(keys=req)]
+
+            return fetched, result_set._last_key_seen
+
+        # Identical concurrent eventually consistent list requests share a single DynamoDB call
+        plan_key = ('scan' if scanning else 'query', dynamo_filter, filter_conditions, limit, order_asc, consistent)
+        _items, last_key_seen = self._coalesce(plan_key, fetch_items, consistent)
+        # Waiters share the fetched items and dehydration changes them, every request gets its copies
+        _items = [dict(it.items()) for it in _items]
 
         if query_filter:
-            print 'Got a query filter:', query_filter
-            # We need to filter items on the fly as well
-            __items = []
-            for it in _items:
-                val = int(it[rkey])
-                first_filter = val > offset_range if order_asc else val < offset_range
-                if first_filter and val >= query_filter[0] and val <= query_filter[1]:
-                    __items.append(it)
-
-            items = sorted(__items, key=itemgetter('ts'), reverse=not order_asc)
+            with profiling.span('sort'):
+                items = sorted(_items, key=itemgetter(rkey), reverse=not order_asc)
 
             if len(items) > real_limit:
                 items = items[:real_limit]
+                window = query_filter
                 query_filter = {}
-                _rfield = filter(lambda k: k.find(index_range_field + '__') == 0, dynamo_filter.keys())[0]
-                query_filter[index_field] = dynamo_filter[_rfield]
+                if index_range_field:
+                    _rfield = filter(lambda k: k.find(index_range_field + '__') == 0, dynamo_filter.keys())[0]
+                    query_filter[index_field] = dynamo_filter[_rfield]
                 if cutoff_ts:
                     if order_asc:
-                        query_filter[rkey + '__from'] = int(items[-1]['ts'])
+                        query_filter[rkey + '__from'] = int(items[-1][rkey])
                         query_filter[rkey + '__to'] = 1999999999999
                     else:
                         query_filter[rkey + '__from'] = 0
-                        query_filter[rkey + '__to'] = int(items[-1]['ts'])
+                        query_filter[rkey + '__to'] = int(items[-1][rkey])
                 else:
-                    query_filter[rkey + '__from'] = get_params[rkey + '__from']
-                    query_filter[rkey + '__to'] = get_params[rkey + '__to']
+                    query_filter[rkey + '__from'] = window[0]
+                    query_filter[rkey + '__to'] = window[1]
 
-                query_filter['offset_range'] = int(items[-1]['ts'])
+                query_filter['offset_range'] = int(items[-1][rkey])
             else:
                 query_filter = None
 
@@ -529,28 +1141,19 @@ class DynamoHashResource(Resource):
             items = [it for it in _items]
 
         if rkey:
-            items.sort(key=lambda it: it[rkey], reverse=not order_asc)
+            with profiling.span('sort'):
+                items.sort(key=lambda it: it[rkey], reverse=not order_asc)
 
         items = items[:real_limit]
 
-        paginator = self._meta.paginator_class(get_params, items, resource_uri=self.get_resource_uri(), limit=real_limit, max_limit=self._meta.max_limit,
-                        collection_name=self._meta.collection_name)
-        to_be_serialized = paginator.page()
-
-        bundles = []
-        for item in to_be_serialized['objects']:
-            obj = DynamoObject(item)
-            bundle = self.build_bundle(obj=obj, request=request)
-            bundles.append(self.full_dehydrate(bundle))
-
         # generate 'next' URI using _last_key_seen
-        if not _items._last_key_seen and not query_filter:
+        if not last_key_seen and not query_filter:
             next_uri = None
         else:
             if query_filter:
                 last_hash_key = dynamo_filter[hkey + '__eq']
             else:
-                last_hash_key = _items._last_key_seen[self._get_hash().name]
+                last_hash_key = last_key_seen[self._get_hash().name]
 
             next_uri = '/api/%s/%s/?offset_hash=%s' % (kwargs['api_name'], kwargs['resource_name'], last_hash_key )
 
@@ -567,20 +1170,431 @@ class DynamoHashResource(Resource):
                     next_uri += '&%s=%s' % (key, val)
             else:
                 if hkey:
-                    next_uri += '&offset_range=%s' % _items._last_key_seen[rkey]
+                    next_uri += '&offset_range=%s' % last_key_seen[rkey]
                 if 'limit' in get_params:
                     next_uri += '&limit=%s' % get_params['limit']
 
             if 'format' in get_params:
                 next_uri += '&format=%s' % get_params['format']
 
+            # Attribute filters have to apply to the next pages too
+            written = set([hkey]).union(query_filter or ())
+            filters = [(key, unicode(val).encode('utf-8')) for key, val in sorted(request.GET.items())
+                       if key.lower() not in RESERVED_LIST_PARAMS and key.lower() not in written]
+            if filters:
+                next_uri += '&' + urllib.urlencode(filters)
+
+        return self._create_list_response(request, get_params, items, real_limit, next_uri)
+
+    def _create_list_response(self, request, get_params, items, limit, next_uri):
+        paginator = self._meta.paginator_class(get_params, items, resource_uri=self.get_resource_uri(), limit=limit, max_limit=self._meta.max_limit,
+                        collection_name=self._meta.collection_name)
+        to_be_serialized = paginator.page()
+
+        bundles = []
+        for item in to_be_serialized['objects']:
+            obj = DynamoObject(item)
+            bundle = self.build_bundle(obj=obj, request=request)
+            bundles.append(self.full_dehydrate(bundle))
+
         to_be_serialized['meta']['next'] = next_uri
 
         to_be_serialized[self._meta.collection_name] = bundles
         to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
         return self.create_response(request, to_be_serialized)
 
-    def obj_delete_list(self, request=None, **k):
+    def _encode_cursor(self, cursor):
+        return base64.urlsafe_b64encode(json.dumps(cursor, default=json_default))
+
+    def _decode_cursor(self, value):
+        try:
+            return json.loads(base64.urlsafe_b64decode(str(value)))
+        except (TypeError, ValueError):
+            raise BadRequest('Invalid offset_keys cursor')
+
+    def get_fan_out_list(self, request, hash_keys, dynamo_filter, filter_conditions, order_asc, limit, get_params):
+        """
+        Runs one query per hash key concurrently and merges the results
+        in sort key order, stopping at ``limit``.
+        Tables without a range key have a single item per hash key,
+        those are batch-got in the order of ``hash_keys`` instead.
+
+        ``dynamo_filter`` holds the range/index conditions shared by every query,
+        ``filter_conditions`` the conditions on non-key attributes.
+        The ``offset_keys`` cursor in the NEXT URL stores the exclusive start key
+        of each hash key that still has results, exhausted keys are dropped.
+        """
+        hkey = self._get_hash().name
+        rkey = self._get_range().name if self._get_range() else None
+        index = dynamo_filter.pop('index', None)
+        sort_key = self._meta.indexes[index][0] if index else rkey
+
+        # Which keys are still active and where do they continue from
+        if 'offset_keys' in get_params:
+            cursor = dict((self._hash_key_type(key), esk) for key, esk in self._decode_cursor(get_params['offset_keys']))
+            hash_keys = [key for key in hash_keys if key in cursor]
+        else:
+            cursor = {}
+
+        consistent = self.is_consistent_read(request)
+
+        if rkey is None:
+            return self._get_hash_only_fan_out_list(request, hash_keys, filter_conditions, limit,
+                                                    consistent, get_params)
+
+        keys_only_index = False
+        if index:
+            index_obj = filter(lambda ind: ind.name == index, self._meta.table.indexes)[0]
+            keys_only_index = index_obj.projection_type == 'KEYS_ONLY'
+
+        key_attrs = [attr for attr in (hkey, rkey, sort_key) if attr]
+
+        def query_hash_key(hash_key):
+            filt = dict(dynamo_filter)
+            filt[hkey + '__eq'] = hash_key
+            if cursor.get(hash_key):
+                filt['exclusive_start_key'] = cursor[hash_key]
+
+            def fetch_items():
+                _items = self._meta.table.query_2(limit=limit, index=index,
+                                                  reverse=not order_asc,
+                                                  consistent=consistent,
+                                                  query_filter=filter_conditions or None,
+                                                  **filt)
+                items = [it for it in _items]
+
+                if keys_only_index and items:
+                    # We need to batch-get actual items, and restore their order
+                    req = [dict((attr, it[attr]) for attr in (hkey, rkey) if attr) for it in items]
+                    items = [it for it in self._meta.table.batch_get(keys=req)]
+                    items.sort(key=lambda it: it[sort_key], reverse=not order_asc)
+
+                return items, _items._last_key_seen is not None
+
+            return self._coalesce(('query', index, filt, filter_conditions, limit, order_asc, consistent),
+                                  fetch_items, consistent)
+
+        if not hash_keys:
+            results = []
+        else:
+            # Worker threads aren't profiled, we time the whole fan-out
+            with profiling.span('dynamo'):
+                results = self._get_fan_out_pool().map(query_hash_key, hash_keys)
+
+        # k-way merge, every result list is already sorted
+        with profiling.span('sort'):
+            merged, consumed = merge_sorted([items for items, _ in results], itemgetter(sort_key),
+                                            limit, reverse=not order_asc)
+        merged = [dict(it.items()) for it in merged]
+
+        next_cursor = []
+        for pos, hash_key in enumerate(hash_keys):
+            items, has_more = results[pos]
+            if consumed[pos]:
+                if consumed[pos] < len(items) or has_more:
+                    last = items[consumed[pos] - 1]
+                    next_cursor.append([hash_key, dict((attr, last[attr]) for attr in key_attrs)])
+            elif items:
+                # Nothing was taken from this key, continue where we were
+                next_cursor.append([hash_key, cursor.get(hash_key)])
+
+        return self._create_list_response(request, get_params, merged, limit,
+                                          self._fan_out_next_uri(request, next_cursor))
+
+    def _get_fan_out_pool(self):
+        """Worker threads of the fan-out queries, shared by all requests to this resource"""
+        with self._fan_out_lock:
+            if self._fan_out_pool is None:
+                self._fan_out_pool = ThreadPool(self._meta.fan_out_workers)
+            return self._fan_out_pool
+
+    def _get_hash_only_fan_out_list(self, request, hash_keys, filter_conditions, limit, consistent, get_params):
+        """
+        Fan-out over a table without a range key. Every hash key is a single
+        item, so we batch-get them all and filter them ourselves.
+        The cursor keeps the hash keys that weren't reached yet.
+        """
+        hkey = self._get_hash().name
+
+        def fetch_items():
+            return [dict(it.items()) for it in self._meta.table.batch_get(keys=[{hkey: key} for key in hash_keys],
+                                                                          consistent=consistent)]
+
+        if hash_keys:
+            fetched = self._coalesce(('batch_get', hash_keys, consistent), fetch_items, consistent)
+        else:
+            fetched = []
+
+        by_key = dict((it[hkey], dict(it)) for it in fetched)
+        items = []
+        next_cursor = []
+        for hash_key in hash_keys:
+            if len(items) == limit:
+                next_cursor.append([hash_key, None])
+                continue
+            item = by_key.get(hash_key)
+            if item is not None and matches(item, filter_conditions):
+                items.append(item)
+
+        return self._create_list_response(request, get_params, items, limit,
+                                          self._fan_out_next_uri(request, next_cursor))
+
+    def _fan_out_next_uri(self, request, next_cursor):
+        if not next_cursor:
+            return None
+        params = request.GET.copy()
+        params['offset_keys'] = self._encode_cursor(next_cursor)
+        return '%s?%s' % (self.get_resource_uri(), params.urlencode())
+
+    def delete_list(self, request, **kwargs):
+        """
+        Deletes matching items, responds with the counts of obj_delete_list.
+        Only available with Meta.bulk_delete_enabled.
+        """
+        if not self._meta.bulk_delete_enabled:
+            raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
+        bundle = self.build_bundle(request=request)
+        stats = self.obj_delete_list(bundle=bundle, **self.remove_api_resource_names(kwargs))
+        return self.create_response(request, stats)
+
+    def obj_delete_list(self, bundle=None, request=None, **k):
+        """
+        Deletes all items matching the list filter, resolved the same way as in get_list.
+
+        Only key attributes are read, with one query per hash key or a parallel scan
+        (Meta.bulk_delete_segments). Tables without a range key delete the given
+        hash keys directly, batch-getting them first only to apply filters. Items are deleted with 25 item BatchWriteItem
+        calls on at most Meta.bulk_delete_workers threads. Unprocessed items are retried
+        (Meta.bulk_delete_max_retries) and Meta.bulk_delete_rate caps deletes per second.
+
+        With a ``bundle`` every batch goes through authorized_delete_list first, the
+        objects it gets only have key attributes. Unknown GET parameters are refused,
+        a misspelled filter must not widen the delete.
+
+        Returns counts: scanned, deleted, denied, failed, batches, retries and elapsed seconds.
+        """
+        if bundle is not None:
+            request = bundle.request
+        plan = self.build_list_plan(request, k)
+
+        unknown = self._unknown_list_params(plan['get_params'])
+        if unknown:
+            raise BadRequest('Unknown filter parameters: %s' % ', '.join(sorted(unknown)))
+
+        hkey = self._get_hash().name
+        rkey = self._get_range().name if self._get_range() else None
+        key_attrs = [attr for attr in (hkey, rkey) if attr]
+
+        dynamo_filter = plan['dynamo_filter']
+        filter_conditions = plan['filter_conditions']
+        dynamo_filter.pop('exclusive_start_key', None)
+
+        if plan['hash_key_in']:
+            hash_keys = plan['hash_key_in']
+        elif plan['hash_key_filter']:
+            hash_keys = [dynamo_filter.pop(hkey + '__eq')]
+        else:
+            hash_keys = None
+
+        if not hash_keys and not dynamo_filter and not filter_conditions and not self._meta.bulk_delete_allow_all:
+            raise BadRequest('Refusing to delete the whole table without a filter')
+
+        def query_keys(hash_key):
+            filt = dict(dynamo_filter)
+            filt[hkey + '__eq'] = hash_key
+            return self._meta.table.query_2(attributes=key_attrs,
+                                            query_filter=filter_conditions or None,
+                                            **filt)
+
+        def get_keys(keys):
+            # query_2 refuses a lone hash key condition, and each hash key is a single item anyway
+            if not filter_conditions:
+                return [{hkey: key} for key in keys]
+            items = self._meta.table.batch_get(keys=[{hkey: key} for key in keys], consistent=True)
+            return [it for it in items if matches(it, filter_conditions)]
+
+        def scan_keys(segment):
+            filt = dict(dynamo_filter)
+            filt.pop('index', None)
+            filt.update(filter_conditions)
+            return self._meta.table.scan(segment=segment,
+                                         total_segments=self._meta.bulk_delete_segments,
+                                         attributes=key_attrs,
+                                         **filt)
+
+        if hash_keys and rkey is None:
+            sources = [(get_keys, hash_keys)]
+        elif hash_keys:
+            sources = [(query_keys, hash_key) for hash_key in hash_keys]
+        else:
+            sources = [(scan_keys, segment) for segment in range(self._meta.bulk_delete_segments)]
+
+        stats = dict(scanned=0, deleted=0, denied=0, failed=0, batches=0, retries=0)
+        touched_hash_keys = set()
+        lock = threading.Lock()
+        limiter = RateLimiter(self._meta.bulk_delete_rate)
+        started = time.time()
+
+        def delete_source(source):
+            read, arg = source
+            keys = (dict((attr, it[attr]) for attr in key_attrs) for it in read(arg))
+            for batch in chunks(keys, 25):
+                allowed = batch
+                if bundle is not None:
+                    objects = self.authorized_delete_list([DynamoObject(key) for key in batch], bundle)
+                    allowed = [obj.to_dict() for obj in objects]
+                deleted, retries = self._batch_delete(allowed, limiter) if allowed else (0, 0)
+                with lock:
+                    stats['scanned'] += len(batch)
+                    stats['denied'] += len(batch) - len(allowed)
+                    stats['deleted'] += deleted
+                    stats['failed'] += len(allowed) - deleted
+                    stats['batches'] += 1 if allowed else 0
+                    stats['retries'] += retries
+                    stats['elapsed'] = time.time() - started
+                    touched_hash_keys.update(key[hkey] for key in allowed)
+                    self.bulk_delete_progress(dict(stats))
+
+        pool = ThreadPool(min(len(sources), self._meta.bulk_delete_workers))
+        try:
+            pool.map(delete_source, sources)
+        finally:
+            pool.close()
+
+        # Batch deletes only know keys, so aggregates are recomputed instead
+        if self._meta.aggregate_table is not None:
+            for hash_key in touched_hash_keys:
+                self.rebuild_aggregates(hash_key)
+
+        stats['elapsed'] = time.time() - started
+        return stats
+
+    def _unknown_list_params(self, get_params):
+        """GET parameters of a list request that are neither reserved nor name a key, index or field"""
+        known = set(self.fields.keys())
+        known.update(field.name for field in (self._get_hash(), self._get_range()) if field)
+        known.update(itertools.chain(*self._meta.indexes.values()))
+
+        unknown = []
+        for param in get_params:
+            if param in RESERVED_LIST_PARAMS:
+                continue
+            name, _, op = param.rpartition('__')
+            if op not in LIST_FILTER_OPERATORS and op not in ('from', 'to'):
+                name = param
+            if name not in known:
+                unknown.append(param)
+        return unknown
+
+    def _batch_delete(self, keys, limiter):
+        """
+        Deletes up to 25 keys with BatchWriteItem, retrying unprocessed items
+        with exponential backoff. Returns (deleted count, retries).
+        """
+        table = self._meta.table
+        requests = [{'DeleteRequest': {'Key': table._encode_keys(key)}} for key in keys]
+
+        retries = 0
+        while True:
+            limiter.acquire(len(requests))
+            resp = table.connection.batch_write_item({table.table_name: requests})
+            requests = resp.get('UnprocessedItems', {}).get(table.table_name, [])
+            if not requests or retries >= self._meta.bulk_delete_max_retries:
+                break
+            retries += 1
+            time.sleep(min(0.05 * 2 ** retries, 5))
+
+        return len(keys) - len(requests), retries
+
+    def export(self, output, format='ndjson', checkpoint=None, request=None):
+        """
+        Exports the whole table to ``output`` (any file-like object, an HttpResponse too)
+        as NDJSON or CSV, dehydrated with the fields of this resource.
+
+        Meta.export_segments segments of a parallel scan run on their own threads.
+        If ``checkpoint`` (a file path) is given, the LastEvaluatedKey of every segment
+        is saved there after each page is written, and calling export again with the
+        same checkpoint and the output opened for appending resumes where it stopped.
+        A page can be written twice if we die between writing it and saving the checkpoint.
+
+        Returns the number of items written.
+        """
+        if format not in ('ndjson', 'csv'):
+            raise ValueError('Unknown export format: %s' % format)
+
+        state = ScanCheckpoint(checkpoint, self._meta.export_segments)
+        serializer = self._meta.serializer
+        columns = self.fields.keys()
+        lock = threading.Lock()
+
+        if format == 'csv':
+            writer = csv.writer(output)
+            if not state.resumed:
+                writer.writerow(columns)
+
+        def dehydrate(item):
+            bundle = self.build_bundle(obj=DynamoObject(item), request=request)
+            return self.full_dehydrate(bundle)
+
+        def render_page(items):
+            """Dehydrated and serialized page, as UTF-8 encoded bytes"""
+            bundles = [dehydrate(item) for item in items]
+            if format == 'ndjson':
+                lines = []
+                for bundle in bundles:
+                    line = serializer.to_json(bundle)
+                    if isinstance(line, unicode):
+                        line = line.encode('utf-8')
+                    lines.append(line + '\n')
+                return ''.join(lines)
+
+            buf = StringIO()
+            page_writer = csv.writer(buf)
+            for bundle in bundles:
+                data = serializer.to_simple(bundle, {})
+                page_writer.writerow([self._csv_value(data.get(column)) for column in columns])
+            return buf.getvalue()
+
+        def export_segment(segment):
+            progress = state.segments[segment]
+            while not progress['done']:
+                page = self._meta.table._scan(limit=self._meta.export_page_size,
+                                              exclusive_start_key=progress['last_key'],
+                                              segment=segment,
+                                              total_segments=state.total_segments)
+                # Only writing the page and its checkpoint has to be serialized
+                chunk = render_page(page['results'])
+                with lock:
+                    output.write(chunk)
+                    if hasattr(output, 'flush'):
+                        output.flush()
+                    progress['count'] += len(page['results'])
+                    progress['last_key'] = page['last_key']
+                    progress['done'] = page['last_key'] is None
+                    state.save()
+
+        pool = ThreadPool(state.total_segments)
+        try:
+            pool.map(export_segment, sorted(state.segments.keys()))
+        finally:
+            pool.close()
+
+        return sum(progress['count'] for progress in state.segments.values())
+
+    def _csv_value(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, default=json_default)
+        return value
+
+    def bulk_delete_progress(self, stats):
+        """
+        Called after every batch of obj_delete_list with the counts so far.
+        Override to report progress somewhere, does nothing by default.
+        """
         pass
 
 
@@ -629,7 +1643,7 @@ class DynamoHashRangeResource(DynamoHashResource):
         self._range_key_type = int if self._get_range().data_type == 'N' else str
 
     def prepend_urls(self):
-        return [
+        return self._aggregate_urls() + [
             url(r'^(?P<resource_name>%s)/(?P<hash_key>.+)%s(?P<range_key>.+)/$' % (self._meta.resource_name, self._meta.primary_key_delimiter), self.wrap_view('dispatch_detail'), name='api_dispatch_detail'),
         ]
 
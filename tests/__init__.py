@@ -0,0 +1,7 @@
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(SECRET_KEY='tests', ROOT_URLCONF=[], INSTALLED_APPS=[])
+
+import django
+django.setup()
@@ -0,0 +1,171 @@
+"""
+In-memory stand-ins for boto's Table, just enough for the resources to run without AWS.
+"""
+from decimal import Decimal
+import re
+
+from boto.dynamodb2.exceptions import ConditionalCheckFailedException, ItemNotFound
+from boto.dynamodb2.fields import HashKey, RangeKey
+from boto.dynamodb2.types import Dynamizer
+from django.test import RequestFactory
+
+
+class FakeResultSet(list):
+    _last_key_seen = None
+
+
+class FakeConnection(object):
+    """Records the low-level calls made on a table"""
+
+    def __init__(self, table):
+        self.table = table
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            handler = getattr(self.table, '_handle_' + name, None)
+            return handler(*args, **kwargs) if handler else {}
+        return call
+
+
+class FakeTable(object):
+
+    def __init__(self, hash_key, range_key=None, data_type='S', table_name='fake'):
+        self.table_name = table_name
+        self.schema = [HashKey(hash_key, data_type=data_type)]
+        if range_key:
+            self.schema.append(RangeKey(range_key, data_type='N'))
+        self.indexes = []
+        self.global_indexes = []
+        self.items = {}
+        self.queries = []
+        self.connection = FakeConnection(self)
+        self._dynamizer = Dynamizer()
+
+    @property
+    def key_names(self):
+        return [part.name for part in self.schema]
+
+    def _key(self, data):
+        return tuple(data[name] for name in self.key_names)
+
+    def describe(self):
+        return {'Table': {'AttributeDefinitions': [
+            {'AttributeName': part.name, 'AttributeType': part.data_type} for part in self.schema]}}
+
+    def add(self, **data):
+        self.items[self._key(data)] = dict(data)
+
+    def get_item(self, consistent=False, attributes=None, **kwargs):
+        if self._key(kwargs) not in self.items:
+            raise ItemNotFound()
+        return dict(self.items[self._key(kwargs)])
+
+    def batch_get(self, keys, consistent=False, attributes=None):
+        return FakeResultSet(dict(self.items[self._key(key)]) for key in keys if self._key(key) in self.items)
+
+    def put_item(self, data, overwrite=False):
+        self.items[self._key(data)] = dict(data)
+        return True
+
+    def query_2(self, limit=None, index=None, reverse=False, consistent=False, attributes=None,
+                max_page_size=None, query_filter=None, **filter_kwargs):
+        """Hash key condition only, query_filter is ignored"""
+        esk = filter_kwargs.pop('exclusive_start_key', None)
+        if len(self.schema) == 1 and len(filter_kwargs) <= 1:
+            raise AssertionError('boto refuses single key queries on hash-only tables')
+        self.queries.append(dict(filter_kwargs, index=index, exclusive_start_key=esk))
+
+        key_names = list(self.key_names)
+        index_obj = None
+        if index:
+            index_obj = [ind for ind in self.indexes if ind.name == index][0]
+            key_names += [part.name for part in index_obj.parts if part.name not in key_names]
+        sort_key = key_names[-1]
+
+        hkey = key_names[0]
+        found = [dict(it) for it in self.items.values() if it[hkey] == filter_kwargs[hkey + '__eq']]
+        found.sort(key=lambda it: (it.get(sort_key), self._key(it)), reverse=reverse)
+        if esk:
+            keys = [self._key(it) for it in found]
+            found = found[keys.index(self._key(esk)) + 1:]
+
+        results = FakeResultSet(found[:limit] if limit else found)
+        if limit and len(found) > limit:
+            results._last_key_seen = dict((name, results[-1][name]) for name in key_names)
+        if index_obj is not None and index_obj.projection_type == 'KEYS_ONLY':
+            results[:] = [dict((name, it[name]) for name in key_names) for it in results]
+        return results
+
+    def _scan(self, limit=None, exclusive_start_key=None, segment=None, total_segments=None, **kwargs):
+        keys = sorted(key for pos, key in enumerate(sorted(self.items)) if pos % total_segments == segment)
+        if exclusive_start_key:
+            keys = [key for key in keys if key > self._key(exclusive_start_key)]
+        page = keys[:limit] if limit else keys
+        last_key = dict(zip(self.key_names, page[-1])) if limit and len(keys) > limit else None
+        return {'results': [dict(self.items[key]) for key in page], 'last_key': last_key}
+
+    def _encode_keys(self, keys):
+        return dict((name, self._dynamizer.encode(value)) for name, value in keys.items())
+
+    def _decode(self, raw):
+        return dict((name, self._dynamizer.decode(value)) for name, value in raw.items())
+
+    def _handle_put_item(self, table_name, item, return_values=None, **kwargs):
+        data = self._decode(item)
+        old = self.items.get(self._key(data))
+        self.items[self._key(data)] = data
+        return self._returned(old, return_values)
+
+    def _handle_delete_item(self, table_name, key, return_values=None, **kwargs):
+        old = self.items.pop(self._key(self._decode(key)), None)
+        return self._returned(old, return_values)
+
+    def _returned(self, old, return_values):
+        if return_values == 'ALL_OLD' and old is not None:
+            return {'Attributes': self._encode_keys(old)}
+        return {}
+
+    def _handle_update_item(self, table_name, key, update_expression=None, condition_expression=None,
+                            expression_attribute_names=None, expression_attribute_values=None, **kwargs):
+        """Understands the ADD/SET/REMOVE expressions and the conditions the aggregates use"""
+        names = expression_attribute_names or {}
+        values = self._decode(expression_attribute_values or {})
+        data = self._decode(key)
+        item = self.items.get(self._key(data), data)
+
+        if condition_expression:
+            # attribute_not_exists(#r) OR #r <op> :r
+            name, op, value = condition_expression.partition(' OR ')[2].split()
+            current = item.get(names[name])
+            if current is not None and not (current > values[value] if op == '>' else current < values[value]):
+                raise ConditionalCheckFailedException(400, 'The conditional request failed')
+
+        parts = re.split(r'\b(ADD|SET|REMOVE) ', update_expression)[1:]
+        for action, clause in zip(parts[::2], parts[1::2]):
+            for update in clause.strip().split(', '):
+                if action == 'ADD':
+                    name, value = update.split()
+                    item[names[name]] = item.get(names[name], 0) + values[value]
+                elif action == 'SET':
+                    name, value = update.split(' = ')
+                    item[names[name]] = values[value]
+                else:
+                    item.pop(names[update], None)
+
+        self.items[self._key(data)] = item
+        return {}
+
+    def _handle_batch_write_item(self, request_items):
+        for request in request_items[self.table_name]:
+            self.items.pop(self._key(self._decode(request['DeleteRequest']['Key'])), None)
+        return {}
+
+
+def number(value):
+    return Decimal(str(value))
+
+
+def request(path='/', **params):
+    return RequestFactory().get(path, params)
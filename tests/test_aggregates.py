@@ -0,0 +1,171 @@
+import json
+import unittest
+
+from tastypie import fields
+
+from tests.fakes import FakeTable, number, request
+
+from tastypie_dynamodb import resources
+from tastypie_dynamodb.resources import DynamoHashResource, DynamoHashRangeResource
+
+
+class PaymentResource(DynamoHashRangeResource):
+    user = fields.IntegerField(attribute='user')
+    ts = fields.IntegerField(attribute='ts')
+    amount = fields.CharField(attribute='amount', null=True)
+
+    class Meta:
+        resource_name = 'payments'
+        table = FakeTable('user', 'ts', data_type='N')
+        aggregate_table = FakeTable('user', data_type='N', table_name='aggregates')
+        aggregate_sums = ('amount',)
+
+
+class AggregatesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = PaymentResource()
+        self.table = self.resource._meta.table
+        self.aggregates = self.resource._meta.aggregate_table
+        self.table.items.clear()
+        self.aggregates.items.clear()
+
+    def payment(self, ts, amount):
+        return {'user': 1, 'ts': ts, 'amount': number(amount)}
+
+    def stored(self):
+        data = dict(self.aggregates.items.get((1,), {}))
+        data.pop('user', None)
+        return data
+
+    def put(self, ts, amount):
+        bundle = self.resource.build_bundle(data={'user': 1, 'ts': ts, 'amount': amount})
+        self.resource.obj_update(bundle, hash_key=1, range_key=ts)
+
+    def delete(self, ts):
+        self.resource.obj_delete(self.resource.build_bundle(), hash_key=1, range_key=ts)
+
+    def test_counts_and_sums_are_added(self):
+        self.resource.update_aggregates(None, self.payment(5, 3))
+        self.resource.update_aggregates(None, self.payment(2, 4))
+        self.resource.update_aggregates(self.payment(2, 4), self.payment(2, 1))
+        self.assertEqual(self.stored(), {'count': 2, 'sum_amount': 4, 'min_ts': 2, 'max_ts': 5})
+
+    def test_min_max_only_move_outward(self):
+        for ts in (5, 3, 9, 4):
+            self.resource.update_aggregates(None, self.payment(ts, 0))
+        stored = self.stored()
+        self.assertEqual((stored['min_ts'], stored['max_ts']), (3, 9))
+
+    def test_delete_looks_up_min_max(self):
+        for ts in (3, 5, 9):
+            self.table.add(**self.payment(ts, 1))
+        self.resource.rebuild_aggregates(1)
+
+        del self.table.items[(1, 9)]
+        self.resource.update_aggregates(self.payment(9, 1), None)
+        self.assertEqual(self.stored(), {'count': 2, 'sum_amount': 2, 'min_ts': 3, 'max_ts': 5})
+
+        self.table.items.clear()
+        self.resource.update_aggregates(self.payment(3, 1), None)
+        self.resource.update_aggregates(self.payment(5, 1), None)
+        self.assertEqual(self.stored(), {'count': 0, 'sum_amount': 0})
+
+    def test_rebuild(self):
+        for ts, amount in ((3, 1), (5, '2.5'), (4, 0)):
+            self.table.add(**self.payment(ts, amount))
+        data = self.resource.rebuild_aggregates(1)
+        self.assertEqual(data, {'user': 1, 'count': 3, 'sum_amount': number('3.5'), 'min_ts': 3, 'max_ts': 5})
+        self.assertEqual(self.stored(), {'count': 3, 'sum_amount': number('3.5'), 'min_ts': 3, 'max_ts': 5})
+
+    def test_put_uses_the_replaced_item(self):
+        self.put(5, '3')
+        self.put(5, '7')
+        self.put(6, '1')
+        self.assertEqual(self.stored(), {'count': 2, 'sum_amount': 8, 'min_ts': 5, 'max_ts': 6})
+        self.assertFalse([call for call in self.table.connection.calls if call[0] == 'get_item'])
+
+    def test_repeated_delete_counts_once(self):
+        self.put(5, '3')
+        self.put(6, '1')
+        self.delete(5)
+        self.delete(5)
+        self.assertEqual(self.stored(), {'count': 1, 'sum_amount': 1, 'min_ts': 6, 'max_ts': 6})
+
+    def test_failure_keeps_the_write(self):
+        logged = []
+        resources.logger.exception = lambda *args: logged.append(args)
+        try:
+            self.put(5, 'not a number')
+        finally:
+            del resources.logger.exception
+        self.assertEqual(len(logged), 1)
+        self.assertEqual(self.table.items[(1, 5)]['amount'], u'not a number')
+        self.assertEqual(self.stored(), {})
+
+    def test_get_aggregates_gives_plain_numbers(self):
+        self.put(5, '3')
+        self.put(6, '4.5')
+        data = self.resource.get_aggregates(1)
+        self.assertEqual(data, {'user': 1, 'count': 2, 'sum_amount': 7.5, 'min_ts': 5, 'max_ts': 6})
+        self.assertEqual(type(data['count']), int)
+
+        response = self.resource.dispatch_aggregate(request(), hash_key='1')
+        self.assertEqual(json.loads(response.content),
+                         {'user': 1, 'count': 2, 'sum_amount': 7.5, 'min_ts': 5, 'max_ts': 6})
+
+    def test_aggregate_url_only_with_aggregates(self):
+        self.assertEqual([pattern.name for pattern in self.resource.prepend_urls()],
+                         ['api_dispatch_aggregate', 'api_dispatch_detail'])
+        self.assertEqual([pattern.name for pattern in NoteResource().prepend_urls()],
+                         ['api_dispatch_detail'])
+
+
+class NoteResource(DynamoHashRangeResource):
+    class Meta:
+        resource_name = 'notes'
+        table = FakeTable('user', 'ts')
+
+
+class CounterResource(DynamoHashResource):
+    id = fields.CharField(attribute='id')
+    amount = fields.CharField(attribute='amount', null=True)
+
+    class Meta:
+        resource_name = 'counters'
+        table = FakeTable('id')
+        aggregate_table = FakeTable('id', table_name='counter_aggregates')
+        aggregate_sums = ('amount',)
+
+
+class HashOnlyAggregatesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = CounterResource()
+        self.table = self.resource._meta.table
+        self.aggregates = self.resource._meta.aggregate_table
+        self.table.items.clear()
+        self.aggregates.items.clear()
+
+    def put(self, key, amount):
+        bundle = self.resource.build_bundle(data={'id': key, 'amount': amount})
+        self.resource.obj_update(bundle, hash_key=key)
+
+    def test_rebuild(self):
+        self.table.add(id='a', amount=number(3))
+        self.assertEqual(self.resource.rebuild_aggregates('a'), {'id': 'a', 'count': 1, 'sum_amount': 3})
+        self.assertEqual(self.resource.rebuild_aggregates('x'), {'id': 'x', 'count': 0, 'sum_amount': 0})
+
+    def test_writes(self):
+        self.put('a', '3')
+        self.put('a', '5')
+        self.assertEqual(self.resource.get_aggregates('a'), {'id': 'a', 'count': 1, 'sum_amount': 5})
+
+    def test_bulk_delete_rebuilds(self):
+        self.put('a', '3')
+        self.put('b', '4')
+        stats = self.resource.obj_delete_list(request=request(id__in='a'))
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(sorted(self.table.items), [('b',)])
+        self.assertEqual(self.resource.get_aggregates('a'), {'id': 'a', 'count': 0, 'sum_amount': 0})
+        self.assertEqual(self.resource.get_aggregates('b'), {'id': 'b', 'count': 1, 'sum_amount': 4})
@@ -0,0 +1,72 @@
+from decimal import Decimal
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from tastypie_dynamodb.bulk import RateLimiter, ScanCheckpoint, chunks, json_default
+
+
+class ChunksTest(unittest.TestCase):
+
+    def test_chunks(self):
+        self.assertEqual(list(chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunks([], 2)), [])
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_unlimited(self):
+        start = time.time()
+        limiter = RateLimiter(None)
+        for _ in range(1000):
+            limiter.acquire()
+        self.assertLess(time.time() - start, 0.1)
+
+    def test_spaces_out_units(self):
+        limiter = RateLimiter(100)
+        start = time.time()
+        limiter.acquire(5)
+        limiter.acquire(5)
+        limiter.acquire(5)
+        # The first acquire goes through at once, the other two wait 0.05s each
+        self.assertGreaterEqual(time.time() - start, 0.09)
+
+
+class JsonDefaultTest(unittest.TestCase):
+
+    def test_decimals(self):
+        self.assertEqual(json.dumps([Decimal('2'), Decimal('2.5')], default=json_default), '[2, 2.5]')
+        self.assertRaises(TypeError, json_default, object())
+
+
+class ScanCheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'export.checkpoint')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_save_and_resume(self):
+        state = ScanCheckpoint(self.path, 2)
+        self.assertFalse(state.resumed)
+        state.segments[1].update(last_key={'id': Decimal('7')}, count=3)
+        state.save()
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+        # total_segments comes from the file, not from the caller
+        resumed = ScanCheckpoint(self.path, 4)
+        self.assertTrue(resumed.resumed)
+        self.assertEqual(resumed.total_segments, 2)
+        self.assertEqual(resumed.segments[1], {'last_key': {'id': 7}, 'done': False, 'count': 3})
+        self.assertEqual(resumed.segments[0]['last_key'], None)
+
+    def test_without_path(self):
+        state = ScanCheckpoint(None, 2)
+        state.save()
+        self.assertEqual(sorted(state.segments), [0, 1])
+        self.assertEqual(os.listdir(self.dir), [])
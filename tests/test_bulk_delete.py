@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from tastypie import fields
+from tastypie.authorization import Authorization, ReadOnlyAuthorization
+from tastypie.exceptions import BadRequest, ImmediateHttpResponse
+
+from tests.fakes import FakeTable, request
+
+from tastypie_dynamodb.resources import DynamoHashResource
+
+
+class HashOnlyResource(DynamoHashResource):
+    color = fields.CharField(attribute='color', null=True)
+
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+
+
+class HashOnlyBulkDeleteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = HashOnlyResource()
+        self.table = self.resource._meta.table
+        self.table.items.clear()
+        for key, color in (('a', u'red'), ('b', u'blue'), ('c', u'red')):
+            self.table.add(id=key, color=color)
+
+    def delete(self, **params):
+        return self.resource.obj_delete_list(request=request(**params))
+
+    def test_deletes_keys(self):
+        stats = self.delete(id__in='a,b,x')
+        self.assertEqual(sorted(self.table.items), [('c',)])
+        self.assertEqual((stats['scanned'], stats['deleted'], stats['batches']), (3, 3, 1))
+
+    def test_deletes_matching_keys(self):
+        stats = self.delete(id__in='a,b,c', color='red')
+        self.assertEqual(sorted(self.table.items), [('b',)])
+        self.assertEqual(stats['deleted'], 2)
+
+    def test_refuses_whole_table(self):
+        self.assertRaises(BadRequest, self.delete)
+
+    def test_refuses_unknown_params(self):
+        self.assertRaises(BadRequest, self.delete, id__in='a', colour='red')
+        self.assertRaises(BadRequest, self.delete, id__in='a', color__like='red')
+        self.assertEqual(len(self.table.items), 3)
+
+    def test_checks_authorization(self):
+        class NotA(Authorization):
+            def delete_list(self, object_list, bundle):
+                return [obj for obj in object_list if obj.id != 'a']
+
+        self.resource._meta.authorization = NotA()
+        try:
+            bundle = self.resource.build_bundle(request=request(id__in='a,b'))
+            stats = self.resource.obj_delete_list(bundle=bundle)
+        finally:
+            self.resource._meta.authorization = ReadOnlyAuthorization()
+        self.assertEqual(sorted(self.table.items), [('a',), ('c',)])
+        self.assertEqual((stats['deleted'], stats['denied']), (1, 1))
+
+    def test_endpoint_is_opt_in(self):
+        self.assertRaises(ImmediateHttpResponse, self.resource.delete_list, request(id__in='a'))
+        self.assertEqual(len(self.table.items), 3)
+
+        self.resource._meta.bulk_delete_enabled = True
+        self.resource._meta.authorization = Authorization()
+        try:
+            response = self.resource.delete_list(request(id__in='a'))
+        finally:
+            self.resource._meta.bulk_delete_enabled = False
+            self.resource._meta.authorization = ReadOnlyAuthorization()
+        self.assertEqual(json.loads(response.content)['deleted'], 1)
+        self.assertEqual(sorted(self.table.items), [('b',), ('c',)])
+
+    def test_read_only_by_default(self):
+        bundle = self.resource.build_bundle(request=request(id__in='a,b'))
+        stats = self.resource.obj_delete_list(bundle=bundle)
+        self.assertEqual((stats['deleted'], stats['denied']), (0, 2))
+        self.assertEqual(len(self.table.items), 3)
@@ -0,0 +1,56 @@
+import time
+import unittest
+
+from tastypie_dynamodb.cache import NegativeCache
+
+
+class NegativeCacheTest(unittest.TestCase):
+
+    def test_add_and_discard(self):
+        cache = NegativeCache(60, 10)
+        cache.add('a')
+        self.assertTrue('a' in cache)
+        self.assertEqual(cache.hits, 1)
+        cache.discard('a')
+        self.assertFalse('a' in cache)
+
+    def test_expires(self):
+        cache = NegativeCache(0.01, 10)
+        cache.add('a')
+        time.sleep(0.02)
+        self.assertFalse('a' in cache)
+
+    def test_drops_oldest(self):
+        cache = NegativeCache(60, 2)
+        for key in ('a', 'b', 'c'):
+            cache.add(key)
+        self.assertFalse('a' in cache)
+        self.assertTrue('b' in cache and 'c' in cache)
+
+    def test_disabled(self):
+        for cache in (NegativeCache(None, 10), NegativeCache(60, 0)):
+            cache.add('a')
+            self.assertFalse('a' in cache)
+
+    def test_skips_keys_written_since(self):
+        cache = NegativeCache(60, 10)
+        generation = cache.generation()
+        cache.discard('a')
+        cache.add('a', generation)
+        self.assertFalse('a' in cache)
+
+        # Writes of other keys don't matter
+        cache.add('b', generation)
+        self.assertTrue('b' in cache)
+        cache.add('a', cache.generation())
+        self.assertTrue('a' in cache)
+
+    def test_forgotten_writes(self):
+        cache = NegativeCache(60, 2)
+        generation = cache.generation()
+        for key in ('a', 'b', 'c'):
+            cache.discard(key)
+        # 'a' isn't remembered anymore, it might have been written
+        cache.add('a', generation)
+        cache.add('x', generation)
+        self.assertFalse('a' in cache or 'x' in cache)
@@ -0,0 +1,142 @@
+import threading
+import time
+import unittest
+
+from tests.fakes import FakeTable, request
+
+from tastypie_dynamodb.coalesce import SingleFlight, freeze
+from tastypie_dynamodb.resources import DynamoHashRangeResource
+
+
+class FreezeTest(unittest.TestCase):
+
+    def test_nested_values(self):
+        self.assertEqual(freeze({'b': [1, 2], 'a': {'c': 3}}), (('a', (('c', 3),)), ('b', (1, 2))))
+        self.assertEqual(hash(freeze({'a': [1]})), hash(freeze({'a': (1,)})))
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def run_concurrently(self, flight, fn, callers=5):
+        """Starts ``callers`` threads calling fn through flight, fn blocks until all of them wait"""
+        started = threading.Event()
+        release = threading.Event()
+        results, errors = [], []
+
+        def leader_fn():
+            started.set()
+            release.wait()
+            return fn()
+
+        def caller():
+            try:
+                results.append(flight.do('key', leader_fn))
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        while flight.stats()['coalesced'] < callers - 1:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_shares_result(self):
+        flight = SingleFlight()
+        results, errors = self.run_concurrently(flight, lambda: 42)
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(errors, [])
+        self.assertEqual(flight.stats(), {'calls': 1, 'coalesced': 4, 'in_flight': 0})
+
+    def test_shares_exception(self):
+        def fail():
+            raise ValueError('boom')
+
+        results, errors = self.run_concurrently(SingleFlight(), fail)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 5)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_shares_base_exception(self):
+        def interrupted():
+            raise SystemExit()
+
+        results, errors = self.run_concurrently(SingleFlight(), interrupted)
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 5)
+
+    def test_sequential_calls_run_again(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+        self.assertEqual(flight.do('key', lambda: 2), 2)
+        self.assertEqual(flight.stats()['calls'], 2)
+
+
+class EventResource(DynamoHashRangeResource):
+    class Meta:
+        resource_name = 'events'
+        table = FakeTable('user', 'ts')
+
+
+class ResourceCoalescingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = EventResource()
+        self.table = self.resource._meta.table
+        self.table.items.clear()
+        del self.table.queries[:]
+        for ts in range(1, 6):
+            self.table.add(user=str((ts - 1) % 2 + 1), ts=ts)
+
+        self.resource._create_list_response = lambda request, params, items, limit, next_uri: items
+        self.resource._fan_out_next_uri = lambda request, cursor: cursor or None
+
+        # Queries wait until every caller has joined the flight
+        self.release = threading.Event()
+        query_2 = self.table.query_2
+
+        def blocking_query_2(*args, **kwargs):
+            self.release.wait()
+            return query_2(*args, **kwargs)
+        self.table.query_2 = blocking_query_2
+
+    def tearDown(self):
+        del self.table.query_2
+
+    def run_together(self, fn, coalesced, callers=3):
+        """Runs fn on several threads, DynamoDB answers once ``coalesced`` calls are waiting"""
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        while self.resource.get_coalescing_stats()['coalesced'] < coalesced:
+            time.sleep(0.001)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_get_list(self):
+        kwargs = {'api_name': 'v1', 'resource_name': 'events'}
+        results = self.run_together(lambda: self.resource.get_list(request(user='1'), **kwargs), 2)
+
+        self.assertEqual([[it['ts'] for it in items] for items in results], [[1, 3, 5]] * 3)
+        self.assertEqual(len(self.table.queries), 1)
+        self.assertEqual(self.resource.get_coalescing_stats(), {'calls': 1, 'coalesced': 2, 'in_flight': 0})
+
+        # Dehydration may change the items, every request has its own
+        self.assertFalse(results[0][0] is results[1][0])
+
+    def test_fan_out(self):
+        results = self.run_together(lambda: self.resource.get_fan_out_list(request(), ['1', '2'], {}, {},
+                                                                           True, 10, {}), 4)
+        self.assertEqual([[it['ts'] for it in items] for items in results], [[1, 2, 3, 4, 5]] * 3)
+        # One query per hash key, shared by all requests
+        self.assertEqual(len(self.table.queries), 2)
+        self.assertEqual(self.resource.get_coalescing_stats(), {'calls': 2, 'coalesced': 4, 'in_flight': 0})
+        self.assertFalse(results[0][0] is results[1][0])
@@ -0,0 +1,184 @@
+import time
+import unittest
+
+from django.http import HttpResponse
+
+from tests.fakes import FakeTable, request
+
+from tastypie_dynamodb import consistency
+from tastypie_dynamodb.coalesce import freeze
+from tastypie_dynamodb.consistency import ReadYourWrites
+from tastypie_dynamodb.resources import DynamoHashResource
+
+
+class CountingFlight(object):
+
+    def __init__(self):
+        self.keys = []
+
+    def do(self, key, fn):
+        self.keys.append(key)
+        return fn()
+
+
+class ThingResource(DynamoHashResource):
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+
+
+class CoalescingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = ThingResource()
+        self.resource._single_flight = CountingFlight()
+        self.resource._meta.table.add(id='a', name=u'A')
+
+    def test_eventual_reads_are_coalesced(self):
+        obj = self.resource.obj_get(None, consistent=False, hash_key='a')
+        self.assertEqual(obj.name, u'A')
+        self.assertEqual(len(self.resource._single_flight.keys), 1)
+
+    def test_strong_reads_are_not_coalesced(self):
+        obj = self.resource.obj_get(None, consistent=True, hash_key='a')
+        self.assertEqual(obj.name, u'A')
+        self.assertEqual(self.resource._single_flight.keys, [])
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+
+class ReadYourWritesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = ThingResource()
+        self.policy = ReadYourWrites(window=10, max_keys=3)
+        self.clock = FakeClock()
+        consistency.time = self.clock
+
+    def tearDown(self):
+        consistency.time = time
+
+    def key(self, hash_key):
+        return freeze({'id': hash_key})
+
+    def session(self, *hash_keys):
+        """Response of a request that wrote hash_keys"""
+        req = request()
+        for hash_key in hash_keys:
+            self.policy.record_write(self.resource, req, self.key(hash_key))
+        response = HttpResponse()
+        self.policy.finalize_response(self.resource, req, response)
+        return response
+
+    def reads_strong(self, hash_key, **meta):
+        req = request()
+        req.META.update(meta)
+        return self.policy.consistent_read(self.resource, req, self.key(hash_key))
+
+    def test_same_request(self):
+        req = request()
+        self.policy.record_write(self.resource, req, self.key('a'))
+        self.assertTrue(self.policy.consistent_read(self.resource, req, self.key('a')))
+        self.assertFalse(self.policy.consistent_read(self.resource, req, self.key('b')))
+
+    def test_cookie_and_header_round_trip(self):
+        response = self.session('a')
+        token = response['X-Dynamo-Session']
+        self.assertEqual(response.cookies['dynamo_session'].value, token)
+        self.assertTrue(response.cookies['dynamo_session']['httponly'])
+
+        req = request()
+        req.COOKIES['dynamo_session'] = token
+        self.assertTrue(self.policy.consistent_read(self.resource, req, self.key('a')))
+        self.assertTrue(self.reads_strong('a', HTTP_X_DYNAMO_SESSION=token))
+        self.assertFalse(self.reads_strong('b', HTTP_X_DYNAMO_SESSION=token))
+        self.assertFalse(self.reads_strong('a'))
+
+    def test_no_session_without_writes(self):
+        response = HttpResponse()
+        self.policy.finalize_response(self.resource, request(), response)
+        self.assertFalse(response.has_header('X-Dynamo-Session'))
+        self.assertFalse('dynamo_session' in response.cookies)
+
+    def test_tampered_token(self):
+        token = self.session('a')['X-Dynamo-Session']
+        self.assertFalse(self.reads_strong('a', HTTP_X_DYNAMO_SESSION=token[:-2] + 'xx'))
+        self.assertFalse(self.reads_strong('a', HTTP_X_DYNAMO_SESSION='garbage'))
+
+    def test_expires_after_window(self):
+        token = self.session('a')['X-Dynamo-Session']
+        self.clock.now += 9
+        self.assertTrue(self.reads_strong('a', HTTP_X_DYNAMO_SESSION=token))
+        self.clock.now += 2
+        self.assertFalse(self.reads_strong('a', HTTP_X_DYNAMO_SESSION=token))
+
+    def test_keeps_most_recent_keys(self):
+        req = request()
+        for hash_key in 'abcde':
+            self.clock.now += 1
+            self.policy.record_write(self.resource, req, self.key(hash_key))
+        response = HttpResponse()
+        self.policy.finalize_response(self.resource, req, response)
+
+        token = response['X-Dynamo-Session']
+        self.assertEqual([hash_key for hash_key in 'abcde' if self.reads_strong(hash_key, HTTP_X_DYNAMO_SESSION=token)],
+                         ['c', 'd', 'e'])
+
+
+class IsConsistentReadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = ThingResource()
+        self.key = freeze({'id': 'a'})
+
+    def test_explicit_request(self):
+        self.assertTrue(self.resource.is_consistent_read(request(consistent='true')))
+        self.assertTrue(self.resource.is_consistent_read(request(consistent='1'), self.key))
+        req = request()
+        req.META['HTTP_X_CONSISTENT_READ'] = 'true'
+        self.assertTrue(self.resource.is_consistent_read(req))
+        self.assertFalse(self.resource.is_consistent_read(request()))
+        self.assertFalse(self.resource.is_consistent_read(None, self.key))
+
+    def test_explicit_request_overrides_policy(self):
+        req = request(consistent='false')
+        self.resource._record_write(req, self.key)
+        self.assertFalse(self.resource.is_consistent_read(req, self.key))
+
+        req = request()
+        self.resource._record_write(req, self.key)
+        self.assertTrue(self.resource.is_consistent_read(req, self.key))
+        # Lists are never about a single key
+        self.assertFalse(self.resource.is_consistent_read(req))
+
+    def test_argument_and_meta(self):
+        self.assertFalse(self.resource.is_consistent_read(request(consistent='true'), consistent=False))
+        self.resource._meta.consistent_read = True
+        try:
+            self.assertTrue(self.resource.is_consistent_read(None))
+        finally:
+            self.resource._meta.consistent_read = False
+
+
+class ObjDeleteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = ThingResource()
+        self.table = self.resource._meta.table
+        self.table.add(id='a')
+
+    def test_without_bundle(self):
+        self.resource.obj_delete(None, hash_key='a')
+        self.assertFalse(('a',) in self.table.items)
+
+    def test_records_the_write(self):
+        bundle = self.resource.build_bundle(request=request())
+        self.resource.obj_delete(bundle, hash_key='a')
+        self.assertTrue(self.resource.is_consistent_read(bundle.request, freeze({'id': 'a'})))
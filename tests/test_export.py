@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from StringIO import StringIO
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from tastypie import fields
+
+from tests.fakes import FakeTable
+
+from tastypie_dynamodb.resources import DynamoHashResource
+
+
+class ThingResource(DynamoHashResource):
+    id = fields.CharField(attribute='id')
+    name = fields.CharField(attribute='name', null=True)
+
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+        export_segments = 2
+        export_page_size = 2
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = ThingResource()
+        self.table = self.resource._meta.table
+        self.table.items.clear()
+        for pos in range(7):
+            self.table.add(id='k%d' % pos, name=u'n\xe4me %d' % pos)
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_ndjson(self):
+        output = StringIO()
+        self.assertEqual(self.resource.export(output), 7)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(all(isinstance(line, str) for line in lines))
+        rows = sorted((json.loads(line.decode('utf-8')) for line in lines), key=lambda row: row['id'])
+        self.assertEqual(rows[3]['name'], u'n\xe4me 3')
+
+    def test_csv(self):
+        output = StringIO()
+        self.resource.export(output, format='csv')
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 8)
+        self.assertTrue('n\xc3\xa4me 0' in output.getvalue())
+
+    def test_checkpoint_resume(self):
+        checkpoint = os.path.join(self.dir, 'checkpoint')
+        self.resource.export(StringIO(), checkpoint=checkpoint)
+
+        # Everything is done, resuming writes nothing new
+        output = StringIO()
+        self.assertEqual(self.resource.export(output, checkpoint=checkpoint), 7)
+        self.assertEqual(output.getvalue(), '')
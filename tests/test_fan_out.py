@@ -0,0 +1,123 @@
+import unittest
+
+from boto.dynamodb2.fields import HashKey, KeysOnlyIndex, RangeKey
+
+from tests.fakes import FakeTable, request
+
+from tastypie_dynamodb.resources import DynamoHashResource, DynamoHashRangeResource
+
+
+class HashOnlyResource(DynamoHashResource):
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+
+
+class HashOnlyFanOutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = HashOnlyResource()
+        self.table = self.resource._meta.table
+        self.table.items.clear()
+        for key, color in (('a', u'red'), ('b', u'blue'), ('c', u'red'), ('d', u'red')):
+            self.table.add(id=key, color=color)
+
+        # Skip dehydration, we only look at what would be returned
+        self.resource._create_list_response = lambda request, params, items, limit, next_uri: (items, next_uri)
+        self.resource._fan_out_next_uri = lambda request, cursor: cursor or None
+
+    def get(self, hash_keys, limit=20, filter_conditions=None, get_params=None):
+        return self.resource.get_fan_out_list(request(), hash_keys, {}, filter_conditions or {},
+                                              True, limit, get_params or {})
+
+    def test_keeps_order_of_keys(self):
+        items, cursor = self.get(['d', 'a', 'x', 'b'])
+        self.assertEqual([it['id'] for it in items], ['d', 'a', 'b'])
+        self.assertEqual(cursor, None)
+
+    def test_filters_items(self):
+        items, _ = self.get(['a', 'b', 'c'], filter_conditions={'color__eq': u'red'})
+        self.assertEqual([it['id'] for it in items], ['a', 'c'])
+
+    def test_cursor_keeps_remaining_keys(self):
+        items, cursor = self.get(['a', 'b', 'c', 'd'], limit=2)
+        self.assertEqual([it['id'] for it in items], ['a', 'b'])
+        self.assertEqual(cursor, [['c', None], ['d', None]])
+
+        encoded = self.resource._encode_cursor(cursor)
+        items, cursor = self.get(['a', 'b', 'c', 'd'], limit=2, get_params={'offset_keys': encoded})
+        self.assertEqual([it['id'] for it in items], ['c', 'd'])
+        self.assertEqual(cursor, None)
+
+    def test_every_request_gets_its_copies(self):
+        shared = [{'id': 'a', 'color': u'red'}]
+        self.resource._coalesce = lambda key, fn, consistent=False: shared
+        items, _ = self.get(['a'])
+        items[0]['color'] = u'changed'
+        self.assertEqual(shared[0]['color'], u'red')
+
+
+events_table = FakeTable('user', 'ts', data_type='N')
+events_table.indexes = [KeysOnlyIndex('score-index', parts=[HashKey('user', data_type='N'), RangeKey('score', data_type='N')])]
+
+
+class EventResource(DynamoHashRangeResource):
+    class Meta:
+        resource_name = 'events'
+        table = events_table
+
+
+class FanOutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = EventResource()
+        self.table = self.resource._meta.table
+        self.table.items.clear()
+        scores = {1: 30, 2: 20, 3: 40, 4: 10, 5: 60, 6: 15, 7: 50, 8: 5}
+        for ts, score in scores.items():
+            self.table.add(user=(ts - 1) % 3 + 1, ts=ts, score=score, note=u'event %d' % ts)
+
+        self.resource._create_list_response = lambda request, params, items, limit, next_uri: (items, next_uri)
+        self.resource._fan_out_next_uri = lambda request, cursor: cursor or None
+
+    def pages(self, hash_keys, limit, order_asc=True, index=None):
+        """Follows the cursor through all pages, returns them as lists of items"""
+        pages, get_params = [], {}
+        while True:
+            dynamo_filter = {'index': index} if index else {}
+            items, cursor = self.resource.get_fan_out_list(request(), hash_keys, dynamo_filter, {},
+                                                           order_asc, limit, get_params)
+            pages.append(items)
+            if cursor is None:
+                return pages
+            get_params = {'offset_keys': self.resource._encode_cursor(cursor)}
+
+    def test_merges_pages_across_keys(self):
+        pages = self.pages([1, 2, 3], 3)
+        self.assertEqual([[it['ts'] for it in page] for page in pages], [[1, 2, 3], [4, 5, 6], [7, 8]])
+
+        # Later pages only query keys that still have items, from where they stopped
+        last_queries = sorted(self.table.queries[-2:], key=lambda query: query['user__eq'])
+        self.assertEqual([query['user__eq'] for query in last_queries], [1, 2])
+        self.assertEqual([query['exclusive_start_key']['ts'] for query in last_queries], [4, 5])
+
+    def test_reverse(self):
+        pages = self.pages([1, 2, 3], 3, order_asc=False)
+        self.assertEqual([[it['ts'] for it in page] for page in pages], [[8, 7, 6], [5, 4, 3], [2, 1]])
+
+    def test_subset_of_keys(self):
+        pages = self.pages([3, 1], 2)
+        self.assertEqual([[it['ts'] for it in page] for page in pages], [[1, 3], [4, 6], [7]])
+
+    def test_keys_only_index(self):
+        pages = self.pages([1, 2, 3], 3, index='score-index')
+        self.assertEqual([[it['score'] for it in page] for page in pages],
+                         [[5, 10, 15], [20, 30, 40], [50, 60]])
+        # Whole items are batch-got for the keys the index returned
+        self.assertEqual(pages[0][0]['note'], u'event 8')
+
+    def test_shares_worker_pool(self):
+        self.pages([1, 2, 3], 3)
+        pool = self.resource._fan_out_pool
+        self.pages([1, 2], 3)
+        self.assertTrue(pool is not None and self.resource._fan_out_pool is pool)
@@ -0,0 +1,86 @@
+import unittest
+import urlparse
+
+from boto.dynamodb2.fields import HashKey, RangeKey, KeysOnlyIndex
+from tastypie import fields
+from tastypie.exceptions import BadRequest
+
+from tests.fakes import FakeTable, request
+
+from tastypie_dynamodb import fields as dynamo_fields
+from tastypie_dynamodb.resources import DynamoHashRangeResource
+
+
+table = FakeTable('user', 'ts', data_type='N')
+table.indexes = [KeysOnlyIndex('status-index', parts=[HashKey('user', data_type='N'), RangeKey('status')])]
+
+
+class EventResource(DynamoHashRangeResource):
+    status = fields.CharField(attribute='status', null=True)
+    score = fields.IntegerField(attribute='score', null=True)
+    tags = dynamo_fields.DynamoListField(attribute='tags', null=True)
+
+    class Meta:
+        resource_name = 'events'
+        table = table
+
+
+class ListPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = EventResource()
+
+    def plan(self, **params):
+        return self.resource.build_list_plan(request(**params), {})
+
+    def test_query_uses_index_and_range(self):
+        plan = self.plan(user='1', status='open', ts__from='5', ts__to='9', score__gt='3')
+        self.assertEqual(plan['dynamo_filter']['index'], 'status-index')
+        self.assertEqual(plan['dynamo_filter']['status__eq'], u'open')
+        self.assertEqual(plan['filter_conditions'], {'ts__between': [5, 9], 'score__gt': 3})
+
+    def test_scan_keeps_index_and_range_conditions(self):
+        plan = self.plan(status='op*', score__from='5', score__to='9')
+        self.assertEqual(plan['filter_conditions'], {'status__beginswith': u'op', 'score__between': [5, 9]})
+
+    def test_scan_single_bound(self):
+        self.assertEqual(self.plan(score__from='5')['filter_conditions'], {'score__gte': 5})
+        self.assertEqual(self.plan(score__to='9')['filter_conditions'], {'score__lte': 9})
+
+    def test_scan_invalid_bound(self):
+        self.assertRaises(BadRequest, self.plan, score__from='x')
+
+    def test_list_fields_take_an_element(self):
+        self.assertEqual(self.plan(tags__contains='foo')['filter_conditions'], {'tags__contains': u'foo'})
+        self.assertEqual(self.plan(tags__ncontains='foo')['filter_conditions'], {'tags__ncontains': u'foo'})
+        self.assertRaises(BadRequest, self.plan, tags__eq='foo')
+        self.assertRaises(BadRequest, self.plan, tags='foo')
+
+
+class NoteResource(DynamoHashRangeResource):
+    status = fields.CharField(attribute='status', null=True)
+
+    class Meta:
+        resource_name = 'notes'
+        table = FakeTable('user', 'ts')
+
+
+class NextUriTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resource = NoteResource()
+        self.table = self.resource._meta.table
+        self.table.items.clear()
+        for ts in range(1, 4):
+            self.table.add(user='1', ts=ts, status=u'open')
+        self.resource._create_list_response = lambda request, params, items, limit, next_uri: next_uri
+
+    def test_keeps_filters(self):
+        next_uri = self.resource.get_list(request(user='1', status__eq=u'op\xe9n', limit='1'),
+                                          api_name='v1', resource_name='notes')
+        path, _, query = next_uri.partition('?')
+        self.assertEqual(path, '/api/v1/notes/')
+        self.assertEqual(urlparse.parse_qs(str(query)), {
+            'offset_hash': ['1'], 'offset_range': ['1'], 'user': ['1'], 'reverse': ['false'],
+            'limit': ['1'], 'status__eq': ['op\xc3\xa9n'],
+        })
@@ -0,0 +1,47 @@
+import unittest
+
+from tastypie_dynamodb.listing import Descending, matches, merge_sorted
+
+
+class MatchesTest(unittest.TestCase):
+
+    def test_comparisons(self):
+        item = {'n': 5, 's': u'abc'}
+        self.assertTrue(matches(item, {'n__eq': 5, 'n__gte': 5, 'n__lt': 6}))
+        self.assertTrue(matches(item, {'n__between': [1, 5], 'n__in': [4, 5]}))
+        self.assertTrue(matches(item, {'s__beginswith': u'ab', 's__contains': u'bc'}))
+        self.assertFalse(matches(item, {'n__eq': 5, 'n__gt': 5}))
+        self.assertFalse(matches(item, {'s__ne': u'abc'}))
+
+    def test_missing_attribute(self):
+        self.assertTrue(matches({}, {'x__ne': 1, 'x__null': True, 'x__ncontains': u'a'}))
+        self.assertFalse(matches({}, {'x__lt': 1}))
+        self.assertFalse(matches({'x': 1}, {'x__null': True}))
+
+    def test_unknown_operator(self):
+        self.assertRaises(ValueError, matches, {'x': 1}, {'x__like': 1})
+
+
+class MergeSortedTest(unittest.TestCase):
+
+    def test_merges_in_order(self):
+        lists = [[1, 4, 7], [2, 5], [], [3, 6, 8]]
+        merged, consumed = merge_sorted(lists, lambda x: x, 10)
+        self.assertEqual(merged, range(1, 9))
+        self.assertEqual(consumed, [3, 2, 0, 3])
+
+    def test_stops_at_limit(self):
+        merged, consumed = merge_sorted([[1, 4, 7], [2, 5], [3, 6]], lambda x: x, 4)
+        self.assertEqual(merged, [1, 2, 3, 4])
+        self.assertEqual(consumed, [2, 1, 1])
+
+    def test_reverse(self):
+        lists = [[{'r': 9}, {'r': 3}], [{'r': 8}, {'r': 5}, {'r': 1}]]
+        merged, consumed = merge_sorted(lists, lambda it: it['r'], 4, reverse=True)
+        self.assertEqual([it['r'] for it in merged], [9, 8, 5, 3])
+        self.assertEqual(consumed, [2, 2])
+
+    def test_descending(self):
+        self.assertTrue(Descending(2) < Descending(1))
+        self.assertFalse(Descending(1) < Descending(1))
+        self.assertEqual(Descending(1), Descending(1))
@@ -0,0 +1,124 @@
+import time
+import unittest
+
+from django.http import Http404
+from tastypie.exceptions import ImmediateHttpResponse
+from tastypie.http import HttpForbidden
+
+from tests.fakes import FakeTable, request
+
+from tastypie_dynamodb import profiling, resources
+from tastypie_dynamodb.resources import DynamoHashResource
+
+
+class SpanTest(unittest.TestCase):
+
+    def tearDown(self):
+        profiling.stop()
+
+    def test_without_profile(self):
+        with profiling.span('dynamo'):
+            pass
+        self.assertEqual(profiling.current(), None)
+
+    def test_nested_spans_are_exclusive(self):
+        profile = profiling.start()
+        with profiling.span('dehydrate'):
+            time.sleep(0.01)
+            with profiling.span('relations'):
+                time.sleep(0.03)
+                with profiling.span('dehydrate'):
+                    time.sleep(0.01)
+
+        phases = profile.phases
+        self.assertTrue(0.02 <= phases['dehydrate'] < 0.03, phases)
+        self.assertTrue(0.03 <= phases['relations'] < 0.04, phases)
+        self.assertTrue(sum(phases.values()) <= profile.total())
+
+    def test_server_timing(self):
+        profile = profiling.start()
+        profile.add('dynamo', 0.0125)
+        self.assertTrue(profile.server_timing().startswith('dynamo;dur=12.5, total;dur='))
+
+
+profiles = []
+
+
+class ProfiledResource(DynamoHashResource):
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+        include_resource_uri = False
+        server_timing = True
+        timing_hook = lambda resource, request, profile: profiles.append(profile)
+
+
+class SlowLoggedResource(DynamoHashResource):
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+        include_resource_uri = False
+        slow_request_threshold = 0
+
+
+class PlainResource(DynamoHashResource):
+    class Meta:
+        resource_name = 'things'
+        table = FakeTable('id')
+        include_resource_uri = False
+
+
+class DispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        del profiles[:]
+        self.resource = ProfiledResource()
+        self.resource._meta.table.add(id='a')
+
+    def get(self, resource, hash_key):
+        return resource.dispatch('detail', request(), hash_key=hash_key)
+
+    def test_header_and_hook(self):
+        response = self.get(self.resource, 'a')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue('dynamo;dur=' in response['Server-Timing'])
+        self.assertTrue('total;dur=' in response['Server-Timing'])
+        self.assertEqual(len(profiles), 1)
+        self.assertTrue('dynamo' in profiles[0].phases)
+        self.assertEqual(profiling.current(), None)
+
+    def test_failed_requests_are_recorded(self):
+        self.assertRaises(Http404, self.get, self.resource, 'missing')
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(profiling.current(), None)
+
+    def test_immediate_response_gets_header(self):
+        def forbidden(*args, **kwargs):
+            raise ImmediateHttpResponse(response=HttpForbidden())
+        self.resource.obj_get = forbidden
+        try:
+            self.get(self.resource, 'a')
+        except ImmediateHttpResponse as e:
+            self.assertTrue('total;dur=' in e.response['Server-Timing'])
+        else:
+            self.fail('ImmediateHttpResponse expected')
+        self.assertEqual(len(profiles), 1)
+
+    def test_slow_request_log(self):
+        logged = []
+        resources.slow_request_logger.warning = lambda *args: logged.append(args)
+        try:
+            resource = SlowLoggedResource()
+            self.assertRaises(Http404, self.get, resource, 'missing')
+        finally:
+            del resources.slow_request_logger.warning
+        # A threshold of 0 logs every request, failed ones too
+        self.assertEqual(len(logged), 1)
+        self.assertTrue(logged[0][0].startswith('Slow request'))
+
+    def test_off_by_default(self):
+        resource = PlainResource()
+        resource._meta.table.add(id='a')
+        response = self.get(resource, 'a')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(profiles, [])